@@ -1,87 +1,31 @@
 import curses
 import time
-import random
-import heapq
 import pygame
 import os
-
-# Constants
-GRID_SIZE = 32
-PLAYER_INITIAL_X, PLAYER_INITIAL_Y = GRID_SIZE // 2, GRID_SIZE - 2
-RINZLER_INITIAL_X, RINZLER_INITIAL_Y = GRID_SIZE // 2, 1
-PLAYER_TRAIL_LENGTH = 20
-RINZLER_TRAIL_LENGTH = 30
-OBSTACLE_COUNT = 10
-INITIAL_SPEED = 0.3
-MAX_SPEED = 0.07
-SPEED_UP_DURATION = 3
+from engine import (
+    GRID_SIZE, SEARCH_TIME_FRACTION, PONDER, GLYPHS, GameState, Ponderer, create_ai, shutdown_ai,
+    next_direction, step, get_speed,
+)
 
 MUSIC_FOLDER = "MUSIC"
 MUSIC_FILES = ["1. Disc Wars.mp3", "2. Derezzed.mp3", "3. The Game Has Changed.mp3"]
-
-def create_grid(size):
-    return [['.' for _ in range(size)] for _ in range(size)]
-
-def place_obstacles(grid, count):
-    obstacles = []
-    for _ in range(count):
-        shape_type = random.choice(['HORIZONTAL', 'VERTICAL', 'L_SHAPE'])
-        x, y = random.randint(1, GRID_SIZE - 5), random.randint(1, GRID_SIZE - 5)
-        
-        if shape_type == 'HORIZONTAL':
-            for i in range(3):
-                grid[y][x + i] = '▬'
-                obstacles.append({'x': x + i, 'y': y, 'symbol': '▬'})
-        elif shape_type == 'VERTICAL':
-            for i in range(3):
-                grid[y + i][x] = '▮'
-                obstacles.append({'x': x, 'y': y + i, 'symbol': '▮'})
-        elif shape_type == 'L_SHAPE':
-            for i in range(2):
-                grid[y][x + i] = '▬'
-                obstacles.append({'x': x + i, 'y': y, 'symbol': '▬'})
-            for i in range(2):
-                grid[y + i][x] = '▮'
-                obstacles.append({'x': x, 'y': y + i, 'symbol': '▮'})
-    return obstacles
-
-def add_boundary_walls(grid):
-    for i in range(GRID_SIZE):
-        grid[0][i] = '─'
-        grid[GRID_SIZE - 1][i] = '─'
-        grid[i][0] = '|'
-        grid[i][GRID_SIZE - 1] = '|'
+KEY_DIRECTIONS = {curses.KEY_UP: 'UP', curses.KEY_DOWN: 'DOWN', curses.KEY_LEFT: 'LEFT', curses.KEY_RIGHT: 'RIGHT'}
 
 def print_grid(stdscr, grid, player, player_trail, rinzler, rinzler_trail, obstacles):
     stdscr.clear()
     for y, row in enumerate(grid):
         for x, cell in enumerate(row):
             stdscr.addch(y, x * 2, cell)  # Multiply x by 2 for better spacing
-    for t in player_trail:
-        stdscr.addch(t['y'], t['x'] * 2, t['symbol'], curses.color_pair(2))
-    for t in rinzler_trail:
-        stdscr.addch(t['y'], t['x'] * 2, t['symbol'], curses.color_pair(5))
-    for obs in obstacles:
-        stdscr.addch(obs['y'], obs['x'] * 2, obs['symbol'], curses.color_pair(6))
-    stdscr.addch(player['y'], player['x'] * 2, player['symbol'], curses.color_pair(1))
-    stdscr.addch(rinzler['y'], rinzler['x'] * 2, rinzler['symbol'], curses.color_pair(4))
+    for x, y, symbol in player_trail:
+        stdscr.addch(y, x * 2, GLYPHS[symbol], curses.color_pair(2))
+    for x, y, symbol in rinzler_trail:
+        stdscr.addch(y, x * 2, GLYPHS[symbol], curses.color_pair(5))
+    for x, y, symbol in obstacles:
+        stdscr.addch(y, x * 2, GLYPHS[symbol], curses.color_pair(6))
+    stdscr.addch(player.y, player.x * 2, GLYPHS[player.symbol], curses.color_pair(1))
+    stdscr.addch(rinzler.y, rinzler.x * 2, GLYPHS[rinzler.symbol], curses.color_pair(4))
     stdscr.refresh()
 
-def update_trail(trail, lightcycle, trail_length):
-    trail.append({'x': lightcycle['x'], 'y': lightcycle['y'], 'symbol': lightcycle['trail_symbol']})
-    if len(trail) > trail_length:
-        trail.pop(0)
-
-def check_collision(lightcycle, trails, obstacles):
-    for trail in trails:
-        for t in trail:
-            if lightcycle['x'] == t['x'] and lightcycle['y'] == t['y']:
-                return True
-    for obs in obstacles:
-        if lightcycle['x'] == obs['x'] and lightcycle['y'] == obs['y']:
-            return True
-    return False
-
 def game_over(stdscr, winner):
     h, w = stdscr.getmaxyx()
     if winner == 'player':
@@ -115,90 +59,6 @@ def game_over(stdscr, winner):
     stdscr.refresh()
     time.sleep(2)
 
-def a_star(start, goal, player_trail, rinzler_trail, obstacles):
-    def heuristic(a, b):
-        return abs(a[0] - b[0]) + abs(a[1] - b[1])
-
-    def get_neighbors(node):
-        neighbors = [
-            (node[0] + 1, node[1]),
-            (node[0] - 1, node[1]),
-            (node[0], node[1] + 1),
-            (node[0], node[1] - 1)
-        ]
-        valid_neighbors = []
-        for x, y in neighbors:
-            if 0 <= x < GRID_SIZE and 0 <= y < GRID_SIZE:
-                if not any(t['x'] == x and t['y'] == y for t in player_trail + rinzler_trail + obstacles):
-                    valid_neighbors.append((x, y))
-        return valid_neighbors
-
-    open_set = []
-    heapq.heappush(open_set, (0, start))
-    came_from = {}
-    g_score = {start: 0}
-    f_score = {start: heuristic(start, goal)}
-
-    while open_set:
-        _, current = heapq.heappop(open_set)
-
-        if current == goal:
-            path = []
-            while current in came_from:
-                path.append(current)
-                current = came_from[current]
-            path.reverse()
-            return path
-
-        for neighbor in get_neighbors(current):
-            tentative_g_score = g_score[current] + 1
-
-            if neighbor not in g_score or tentative_g_score < g_score[neighbor]:
-                came_from[neighbor] = current
-                g_score[neighbor] = tentative_g_score
-                f_score[neighbor] = tentative_g_score + heuristic(neighbor, goal)
-                heapq.heappush(open_set, (f_score[neighbor], neighbor))
-
-    return []
-
-def evaluate_future_moves(rinzler, player, player_trail, rinzler_trail, obstacles, depth=3):
-    possible_moves = {
-        'UP': (0, -1),
-        'DOWN': (0, 1),
-        'LEFT': (-1, 0),
-        'RIGHT': (1, 0)
-    }
-
-    best_move = None
-    best_score = float('inf')
-
-    for move, (dx, dy) in possible_moves.items():
-        future_rinzler = {'x': rinzler['x'] + dx, 'y': rinzler['y'] + dy}
-        if check_collision(future_rinzler, [player_trail, rinzler_trail], obstacles):
-            continue
-
-        path = a_star((future_rinzler['x'], future_rinzler['y']), (player['x'], player['y']), player_trail, rinzler_trail, obstacles)
-        if not path:
-            continue
-
-        future_score = 0
-        for future_step in path[:depth]:
-            future_score += abs(future_step[0] - player['x']) + abs(future_step[1] - player['y'])
-
-        if future_score < best_score:
-            best_score = future_score
-            best_move = move
-
-    return best_move if best_move else 'DOWN'
-
-def move_rinzler(rinzler, player, player_trail, rinzler_trail, obstacles):
-    return evaluate_future_moves(rinzler, player, player_trail, rinzler_trail, obstacles)
-
-def get_speed(elapsed_time):
-    if elapsed_time < SPEED_UP_DURATION:
-        return INITIAL_SPEED - (elapsed_time / SPEED_UP_DURATION) * (INITIAL_SPEED - MAX_SPEED)
-    return MAX_SPEED
-
 def play_music():
     pygame.mixer.init()
     music_files = [os.path.join(MUSIC_FOLDER, file) for file in MUSIC_FILES]
@@ -210,7 +70,7 @@ def play_music():
 
 def show_menu(stdscr):
     menu_title = "TR0N: CYCL3S"
-    menu_options = ["P - Play", "Q - Quit"]
+    menu_options = ["P - Play", "C - Classic (trails never fade)", "Q - Quit"]
     
     stdscr.clear()
     h, w = stdscr.getmaxyx()
@@ -230,6 +90,8 @@ def show_menu(stdscr):
         key = stdscr.getch()
         if key == ord('p') or key == ord('P'):
             return 'play'
+        elif key == ord('c') or key == ord('C'):
+            return 'classic'
         elif key == ord('q') or key == ord('Q'):
             return 'quit'
 
@@ -251,16 +113,9 @@ def main(stdscr):
             pygame.mixer.music.stop()
             break
 
-        grid = create_grid(GRID_SIZE)
-        add_boundary_walls(grid)
-        obstacles = place_obstacles(grid, OBSTACLE_COUNT)
-        player = {'x': PLAYER_INITIAL_X, 'y': PLAYER_INITIAL_Y, 'symbol': '▮', 'trail_symbol': '║'}
-        player_trail = []
-        rinzler = {'x': RINZLER_INITIAL_X, 'y': RINZLER_INITIAL_Y, 'symbol': '▮', 'trail_symbol': '║'}
-        rinzler_trail = []
-
-        player_direction = 'UP'
-        rinzler_direction = 'DOWN'
+        state = GameState(classic=action == 'classic')
+        ai = create_ai(zobrist=state.zobrist)
+        ponderer = Ponderer() if PONDER else None
 
         stdscr.nodelay(1)  # Make getch() non-blocking
         key = -1
@@ -285,74 +140,20 @@ def main(stdscr):
             new_key = stdscr.getch()
             if new_key != -1:
                 key = new_key
-
-            if key == curses.KEY_UP and player_direction != 'DOWN':
-                player['symbol'] = '▮'
-                player['trail_symbol'] = '║'
-                player_direction = 'UP'
-            elif key == curses.KEY_DOWN and player_direction != 'UP':
-                player['symbol'] = '▮'
-                player['trail_symbol'] = '║'
-                player_direction = 'DOWN'
-            elif key == curses.KEY_LEFT and player_direction != 'RIGHT':
-                player['symbol'] = '▬'
-                player['trail_symbol'] = '═'
-                player_direction = 'LEFT'
-            elif key == curses.KEY_RIGHT and player_direction != 'LEFT':
-                player['symbol'] = '▬'
-                player['trail_symbol'] = '═'
-                player_direction = 'RIGHT'
-
-            # Update player position
-            if player_direction == 'UP':
-                player['y'] -= 1
-            elif player_direction == 'DOWN':
-                player['y'] += 1
-            elif player_direction == 'LEFT':
-                player['x'] -= 1
-            elif player_direction == 'RIGHT':
-                player['x'] += 1
-
-            # Update Rinzler's direction and position
-            rinzler_direction = move_rinzler(rinzler, player, player_trail, rinzler_trail, obstacles)
-
-            if rinzler_direction == 'UP':
-                rinzler['symbol'] = '▮'
-                rinzler['trail_symbol'] = '║'
-                rinzler['y'] -= 1
-            elif rinzler_direction == 'DOWN':
-                rinzler['symbol'] = '▮'
-                rinzler['trail_symbol'] = '║'
-                rinzler['y'] += 1
-            elif rinzler_direction == 'LEFT':
-                rinzler['symbol'] = '▬'
-                rinzler['trail_symbol'] = '═'
-                rinzler['x'] -= 1
-            elif rinzler_direction == 'RIGHT':
-                rinzler['symbol'] = '▬'
-                rinzler['trail_symbol'] = '═'
-                rinzler['x'] += 1
-
-            # Check for boundary collision
-            if (player['x'] < 1 or player['x'] >= GRID_SIZE - 1 or player['y'] < 1 or player['y'] >= GRID_SIZE - 1):
-                game_over(stdscr, 'rinzler')
-                break
-            if (rinzler['x'] < 1 or rinzler['x'] >= GRID_SIZE - 1 or rinzler['y'] < 1 or rinzler['y'] >= GRID_SIZE - 1):
-                game_over(stdscr, 'player')
-                break
-
-            # Check for trail and obstacle collision
-            if check_collision(player, [player_trail, rinzler_trail], obstacles):
-                game_over(stdscr, 'rinzler')
-                break
-            if check_collision(rinzler, [player_trail, rinzler_trail], obstacles):
-                game_over(stdscr, 'player')
+            player_direction = next_direction(state.player_direction, KEY_DIRECTIONS.get(key))
+
+            # Advance the game by one tick, reusing Rinzler's pondered move when the guess was right
+            # The budget is set after take() has joined the pondering thread
+            rinzler_direction = ponderer.take(state, player_direction) if ponderer else None
+            ai['budget'] = get_speed(frame_start_time - start_time) * SEARCH_TIME_FRACTION
+            winner = step(state, player_direction, ai, rinzler_direction)
+            if winner:
+                game_over(stdscr, winner)
                 break
 
-            update_trail(player_trail, player, PLAYER_TRAIL_LENGTH)
-            update_trail(rinzler_trail, rinzler, RINZLER_TRAIL_LENGTH)
-
-            print_grid(stdscr, grid, player, player_trail, rinzler, rinzler_trail, obstacles)
+            print_grid(stdscr, state.grid, state.player, state.player_trail, state.rinzler, state.rinzler_trail, state.obstacles)
+            if ponderer:
+                ponderer.start(state, ai)
             
             # Ensure consistent frame rate
             elapsed_time = time.time() - start_time
@@ -360,5 +161,9 @@ def main(stdscr):
             frame_elapsed_time = time.time() - frame_start_time
             time.sleep(max(speed - frame_elapsed_time, 0))
 
+        if ponderer:
+            ponderer.stop()
+        shutdown_ai(ai)
+
 if __name__ == "__main__":
     curses.wrapper(main)
@@ -0,0 +1,238 @@
+import random
+from collections import deque
+
+from engine import (
+    GRID_SIZE, PLAYER_INITIAL_X, PLAYER_INITIAL_Y, RINZLER_INITIAL_X, RINZLER_INITIAL_Y,
+    PLAYER_TRAIL_LENGTH, RINZLER_TRAIL_LENGTH, OBSTACLE_COUNT, OPPOSITE, create_grid,
+    create_occupancy, place_obstacles, occupancy_mask, board_masks,
+)
+
+CELLS = GRID_SIZE * GRID_SIZE
+ORDER = ['UP', 'DOWN', 'LEFT', 'RIGHT']
+TURN_BITS = 3  # The random player turns with probability 1 / 2**TURN_BITS each tick
+
+def tile(mask, n):
+    # Repeat one board's mask across n boards
+    return int.from_bytes(mask.to_bytes(CELLS // 8, 'little') * n, 'little')
+
+class BatchGame:
+    # N matches packed side by side into Python ints, one bit per cell: bit
+    # k * CELLS + y * GRID_SIZE + x is cell (x, y) of match k. Heads, trails and walls
+    # are such planes, and each direction is a plane holding the heads moving that
+    # way, so one tick of every match is a fixed number of big-int operations.
+    # Everything stays non-negative: ~x on a huge int costs several times an AND.
+    # Finished matches are packed out of the planes once half the slots are idle;
+    # self.matches maps each slot back to its match number.
+    def __init__(self, n, seed=None):
+        rng = random.Random(seed)
+        self.n = n
+        self.rng = rng
+        self.matches = list(range(n))
+        self.set_width(n)
+        obstacles = 0
+        for k in range(n):
+            occupancy = create_occupancy(GRID_SIZE)
+            place_obstacles(create_grid(GRID_SIZE), OBSTACLE_COUNT, occupancy, rng)
+            obstacles |= occupancy_mask(occupancy) << (k * CELLS)
+        self.obstacles = obstacles
+        self.player = tile(1 << (PLAYER_INITIAL_Y * GRID_SIZE + PLAYER_INITIAL_X), n)
+        self.rinzler = tile(1 << (RINZLER_INITIAL_Y * GRID_SIZE + RINZLER_INITIAL_X), n)
+        self.player_dirs = {'UP': self.player, 'DOWN': 0, 'LEFT': 0, 'RIGHT': 0}
+        self.rinzler_dirs = {'UP': 0, 'DOWN': self.rinzler, 'LEFT': 0, 'RIGHT': 0}
+        self.player_trail = self.rinzler_trail = 0
+        self.player_history = deque()
+        self.rinzler_history = deque()
+        self.winners = [None] * n
+        self.lengths = [0] * n
+        self.running = n
+        self.tick = 0
+
+    def set_width(self, width):
+        # Rebuild the constant planes for `width` packed boards
+        full, left, right, border = board_masks(GRID_SIZE)
+        self.width = width
+        self.full = (1 << (width * CELLS)) - 1
+        self.border = tile(border, width)
+        self.right_wall = tile(right, width)
+        self.last_bit = tile(1 << (CELLS - 1), width)
+        # Keep the column fill in the rinzler policy from spilling into the next board
+        self.not_first_rows = {s: tile(full ^ ((1 << (s * GRID_SIZE)) - 1), width) for s in (1, 2, 4, 8, 16)}
+        self.not_last_rows = {s: tile((1 << ((GRID_SIZE - s) * GRID_SIZE)) - 1, width) for s in (1, 2, 4, 8, 16)}
+
+    def compact(self):
+        # Drop the slots of finished matches from every plane
+        keep = [slot for slot, match in enumerate(self.matches) if self.winners[match] is None]
+        size = CELLS // 8
+
+        def pack(plane):
+            data = plane.to_bytes(self.width * size, 'little')
+            return int.from_bytes(b''.join(data[slot * size:(slot + 1) * size] for slot in keep), 'little')
+
+        self.obstacles = pack(self.obstacles)
+        self.player, self.rinzler = pack(self.player), pack(self.rinzler)
+        self.player_trail, self.rinzler_trail = pack(self.player_trail), pack(self.rinzler_trail)
+        self.player_dirs = {d: pack(plane) for d, plane in self.player_dirs.items()}
+        self.rinzler_dirs = {d: pack(plane) for d, plane in self.rinzler_dirs.items()}
+        self.player_history = deque(pack(plane) for plane in self.player_history)
+        self.rinzler_history = deque(pack(plane) for plane in self.rinzler_history)
+        self.matches = [self.matches[slot] for slot in keep]
+        self.set_width(len(keep))
+
+    def blocked(self):
+        return self.border | self.obstacles | self.player_trail | self.rinzler_trail
+
+    def free_moves(self, heads, free):
+        # For each direction, the heads whose neighbour that way is free
+        return {
+            'UP': heads & (free << GRID_SIZE),
+            'DOWN': heads & (free >> GRID_SIZE),
+            'LEFT': heads & (free << 1),
+            'RIGHT': heads & (free >> 1),
+        }
+
+    def player_policy(self):
+        # Keep going straight, turning now and then or when the way ahead is blocked
+        free = self.full ^ (self.blocked() | self.rinzler)
+        ok = self.free_moves(self.player, free)
+        bits = self.rng.getrandbits(self.width * CELLS)
+        turning = self.player
+        for i in range(TURN_BITS):
+            turning &= bits >> i
+        tiers = [{d: self.player_dirs[d] ^ (self.player_dirs[d] & turning) for d in ORDER}]
+        order = ORDER[:]
+        self.rng.shuffle(order)
+        tiers.append({d: self.player for d in order})
+        return assign(self.player, self.player_dirs, tiers, ok)
+
+    def rinzler_policy(self):
+        # Greedy chase: step towards the player's row and column when that cell is free,
+        # otherwise keep going, otherwise take any free cell
+        free = self.full ^ (self.blocked() | self.player)
+        ok = self.free_moves(self.rinzler, free)
+        rinzler = self.rinzler
+
+        # Subtracting a head from the right wall column borrows from the wall cell of
+        # its own row, which picks out that row; every cell after it is in a lower row.
+        row_end = self.right_wall ^ ((self.right_wall - self.player) & self.right_wall)
+        after_row = self.last_bit - row_end
+        below = rinzler & after_row
+        shifted = rinzler << (GRID_SIZE - 1)
+        above = (shifted ^ (shifted & after_row)) >> (GRID_SIZE - 1)
+
+        # The same borrow on a whole column marks, in every row, the cells from the
+        # player's column to the right wall
+        column = self.player
+        for s in (1, 2, 4, 8, 16):
+            column |= ((column << (s * GRID_SIZE)) & self.not_first_rows[s]) | ((column >> (s * GRID_SIZE)) & self.not_last_rows[s])
+        from_column = (self.right_wall - column) ^ self.right_wall
+        right_of = rinzler & (from_column ^ column)
+        left_of = rinzler ^ (rinzler & from_column)
+
+        tiers = [
+            {'DOWN': above, 'UP': below, 'RIGHT': left_of, 'LEFT': right_of},
+            dict(self.rinzler_dirs),
+            {d: rinzler for d in ORDER},
+        ]
+        return assign(rinzler, self.rinzler_dirs, tiers, ok)
+
+    def step(self, player_dirs=None, rinzler_dirs=None):
+        # Advance every running match by one tick. Direction planes default to the
+        # built-in policies; a requested reversal keeps the current direction.
+        if player_dirs is None:
+            player_dirs = self.player_policy()
+        if rinzler_dirs is None:
+            rinzler_dirs = self.rinzler_policy()
+        player_dirs = no_reversals(player_dirs, self.player_dirs)
+        new_player, self.player_dirs = move(player_dirs)
+        new_rinzler, self.rinzler_dirs = move(rinzler_dirs)
+        self.tick += 1
+
+        # Same order as engine.step: boundaries, then trails and obstacles, player first
+        solid = self.obstacles | self.player_trail | self.rinzler_trail
+        player_wall = new_player & self.border
+        rinzler_wall = new_rinzler & self.border
+        player_hit = new_player & solid
+        crashes = player_wall | rinzler_wall | player_hit | (new_rinzler & solid)
+        if crashes:
+            dead = 0
+            for slot in boards(crashes):
+                plane = ((1 << CELLS) - 1) << (slot * CELLS)
+                if player_wall & plane:
+                    winner = 'rinzler'
+                elif rinzler_wall & plane:
+                    winner = 'player'
+                elif player_hit & plane:
+                    winner = 'rinzler'
+                else:
+                    winner = 'player'
+                match = self.matches[slot]
+                self.winners[match] = winner
+                self.lengths[match] = self.tick
+                self.running -= 1
+                dead |= plane
+            # Finished matches lose their heads; their stale direction bits never
+            # meet a head again and drop out on the next move
+            new_player ^= new_player & dead
+            new_rinzler ^= new_rinzler & dead
+
+        self.player, self.rinzler = new_player, new_rinzler
+        self.player_trail = add_to_trail(self.player_trail, self.player_history, new_player, PLAYER_TRAIL_LENGTH)
+        self.rinzler_trail = add_to_trail(self.rinzler_trail, self.rinzler_history, new_rinzler, RINZLER_TRAIL_LENGTH)
+        if self.running and self.running * 2 <= self.width:
+            self.compact()
+        return self.running
+
+    def run(self, max_ticks):
+        while self.running and self.tick < max_ticks:
+            self.step()
+        return self.winners
+
+def boards(plane):
+    # Slots with at least one bit set in plane, highest first
+    found = []
+    while plane:
+        slot = (plane.bit_length() - 1) // CELLS
+        found.append(slot)
+        plane &= (1 << (slot * CELLS)) - 1
+    return found
+
+def assign(heads, current, tiers, ok):
+    # Give every head the first direction, tier by tier, that it prefers and can take;
+    # heads with no free cell keep going (and crash)
+    chosen = {d: 0 for d in ORDER}
+    remaining = heads
+    for tier in tiers:
+        for d, preferred in tier.items():
+            picked = remaining & preferred & ok[d]
+            chosen[d] |= picked
+            remaining ^= picked
+    for d in ORDER:
+        chosen[d] |= remaining & current[d]
+    return chosen
+
+def no_reversals(requested, current):
+    result = dict(requested)
+    for d in ORDER:
+        reversing = requested[d] & current[OPPOSITE[d]]
+        if reversing:
+            result[d] ^= reversing
+            result[OPPOSITE[d]] |= reversing
+    return result
+
+def move(dirs):
+    moved = {
+        'UP': dirs['UP'] >> GRID_SIZE,
+        'DOWN': dirs['DOWN'] << GRID_SIZE,
+        'LEFT': dirs['LEFT'] >> 1,
+        'RIGHT': dirs['RIGHT'] << 1,
+    }
+    return moved['UP'] | moved['DOWN'] | moved['LEFT'] | moved['RIGHT'], moved
+
+def add_to_trail(trail, history, heads, length):
+    # Cells within one trail window never repeat (that would be a crash), so the
+    # expired plane can be XORed back out
+    trail |= heads
+    history.append(heads)
+    if len(history) > length:
+        trail ^= history.popleft()
+    return trail
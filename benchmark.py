@@ -0,0 +1,838 @@
+import random
+import time
+import tracemalloc
+from collections import deque
+
+from engine import (
+    GRID_SIZE, PLAYER_INITIAL_X, PLAYER_INITIAL_Y, RINZLER_INITIAL_X, RINZLER_INITIAL_Y, OBSTACLE_COUNT,
+    MAX_SPEED, SEARCH_TIME_FRACTION, MCTS_WORKERS, OPPOSITE, create_grid, add_boundary_walls, place_obstacles,
+    create_occupancy, build_occupancy, is_occupied, check_collision, update_trail, a_star, jump_point_search,
+    landmark_tables,
+    evaluate_future_moves,
+    evaluate_territory_moves, create_ai, shutdown_ai, move_rinzler, Ponderer, GameState, advance, next_direction, step,
+    Symbol, Lightcycle, CellList, Trail, Owner, StampedBoard, SegmentTrail, HierarchicalPlanner, evaluate_local_moves,
+)
+from batch import BatchGame
+from swarm import SwarmGame
+
+TICKS = 200
+TRAIL_LENGTHS = [20, 50, 100, 200, 400]
+MOVES = {'UP': (0, -1), 'DOWN': (0, 1), 'LEFT': (-1, 0), 'RIGHT': (1, 0)}
+
+def make_board(trail_length, seed=0):
+    grid = create_grid(GRID_SIZE)
+    add_boundary_walls(grid)
+    occupancy = create_occupancy(GRID_SIZE)
+    obstacles = place_obstacles(grid, OBSTACLE_COUNT, occupancy, random.Random(seed))
+    # Lay the trail out as horizontal runs with gaps at both ends so the player stays reachable
+    trail = Trail(max(trail_length, 1))
+    y = 3
+    while len(trail) < trail_length and y < GRID_SIZE - 3:
+        for x in range(3, GRID_SIZE - 3):
+            if len(trail) == trail_length:
+                break
+            trail.append(x, y, Symbol.TRAIL_HORIZONTAL)
+        y += 2
+    player = Lightcycle(PLAYER_INITIAL_X, PLAYER_INITIAL_Y)
+    rinzler = Lightcycle(RINZLER_INITIAL_X, RINZLER_INITIAL_Y)
+    return player, rinzler, trail, obstacles
+
+def ticks_per_second(trail_length, shared_occupancy):
+    player, rinzler, trail, obstacles = make_board(trail_length)
+    occupancy = build_occupancy([], trail, obstacles) if shared_occupancy else None
+    start = time.perf_counter()
+    for _ in range(TICKS):
+        move_rinzler(rinzler, player, [], trail, obstacles, occupancy)
+        check_collision(player, [[], trail], obstacles, occupancy)
+        check_collision(rinzler, [[], trail], obstacles, occupancy)
+    return TICKS / (time.perf_counter() - start)
+
+def evaluate_with_a_star(rinzler, player, player_trail, rinzler_trail, obstacles, occupancy, depth=3):
+    # The pre-distance-field evaluator: one A* search per candidate move
+    best_move, best_score = None, float('inf')
+    for move, (dx, dy) in MOVES.items():
+        future = Lightcycle(rinzler.x + dx, rinzler.y + dy)
+        if check_collision(future, [player_trail, rinzler_trail], obstacles, occupancy):
+            continue
+        path = a_star((future.x, future.y), (player.x, player.y), player_trail, rinzler_trail, obstacles, occupancy)
+        if not path:
+            continue
+        score = sum(abs(x - player.x) + abs(y - player.y) for x, y in path[:depth])
+        if score < best_score:
+            best_move, best_score = move, score
+    return best_move if best_move else 'DOWN'
+
+def distance_field(goal, occupancy):
+    # The pre-bitboard planner: breadth-first distances from goal to every reachable
+    # cell (-1 = unreachable)
+    field = [-1] * (GRID_SIZE * GRID_SIZE)
+    if is_occupied(occupancy, goal[0], goal[1]):
+        return field
+    field[goal[1] * GRID_SIZE + goal[0]] = 0
+    queue = deque([goal])
+    while queue:
+        x, y = queue.popleft()
+        d = field[y * GRID_SIZE + x] + 1
+        for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if 0 <= nx < GRID_SIZE and 0 <= ny < GRID_SIZE:
+                i = ny * GRID_SIZE + nx
+                if field[i] < 0 and not occupancy[i]:
+                    field[i] = d
+                    queue.append((nx, ny))
+    return field
+
+def field_path(field, start, goal, depth):
+    # Follow the distance field downhill from start for up to depth steps
+    d = field[start[1] * GRID_SIZE + start[0]]
+    if d <= 0:
+        return []
+    path = []
+    x, y = start
+    while d > 0 and len(path) < depth:
+        steps = [(nx, ny) for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1))
+                 if 0 <= nx < GRID_SIZE and 0 <= ny < GRID_SIZE and field[ny * GRID_SIZE + nx] == d - 1]
+        x, y = min(steps, key=lambda s: abs(s[0] - goal[0]) + abs(s[1] - goal[1]))
+        path.append((x, y))
+        d -= 1
+    return path
+
+def evaluate_with_distance_field(rinzler, player, player_trail, rinzler_trail, obstacles, occupancy, depth=3):
+    # The pre-bitboard evaluator: a full per-cell BFS distance field, walls not blocked
+    goal = (player.x, player.y)
+    field = distance_field(goal, occupancy)
+    best_move, best_score = None, float('inf')
+    for move, (dx, dy) in MOVES.items():
+        future = Lightcycle(rinzler.x + dx, rinzler.y + dy)
+        if check_collision(future, [player_trail, rinzler_trail], obstacles, occupancy):
+            continue
+        path = field_path(field, (future.x, future.y), goal, depth)
+        if not path:
+            continue
+        score = sum(abs(x - player.x) + abs(y - player.y) for x, y in path[:depth])
+        if score < best_score:
+            best_move, best_score = move, score
+    return best_move if best_move else 'DOWN'
+
+def evaluations_per_second(evaluate, trail_length):
+    player, rinzler, trail, obstacles = make_board(trail_length)
+    occupancy = build_occupancy([], trail, obstacles)
+    start = time.perf_counter()
+    for _ in range(TICKS):
+        evaluate(rinzler, player, [], trail, obstacles, occupancy=occupancy)
+    return TICKS / (time.perf_counter() - start)
+
+def bench_distance_field():
+    print("Move evaluations/sec: 4x A* vs one distance field vs bitboard distance rings")
+    print(f"{'trail':>8} {'4x a_star':>12} {'field':>12} {'bitboard':>12} {'speedup':>8}")
+    for trail_length in TRAIL_LENGTHS:
+        searches = evaluations_per_second(evaluate_with_a_star, trail_length)
+        field = evaluations_per_second(evaluate_with_distance_field, trail_length)
+        rings = evaluations_per_second(evaluate_future_moves, trail_length)
+        print(f"{trail_length:>8} {searches:>12.1f} {field:>12.1f} {rings:>12.1f} {rings / searches:>7.1f}x")
+
+def player_bot(state, rng):
+    return cycle_bot(state, state.player, state.player_direction, rng)
+
+def is_blocked(state, x, y):
+    # Works in both trail modes; in 'stamped' mode state.occupancy is only synced for the AI
+    if state.board is not None:
+        return state.board.is_solid(x, y)
+    return is_occupied(state.occupancy, x, y, state.size)
+
+def cycle_bot(state, lightcycle, direction, rng):
+    # Keep going straight, turning at random now and then or when the way ahead is blocked
+    options = [move for move, (dx, dy) in MOVES.items()
+               if move != OPPOSITE[direction] and 0 < lightcycle.x + dx < state.size - 1
+               and 0 < lightcycle.y + dy < state.size - 1 and not is_blocked(state, lightcycle.x + dx, lightcycle.y + dy)]
+    if direction in options and rng.random() > 0.1:
+        return direction
+    return rng.choice(options) if options else direction
+
+def simulate_match(ticks, seed, planners):
+    # Play `ticks` ticks (restarting after each crash) with Rinzler driven by the
+    # first planner, timing every planner on the same board states. Each planner
+    # factory returns a fresh create_ai() dict. Also counts who won each match.
+    rng = random.Random(seed)
+    timings = {name: 0.0 for name in planners}
+    decisions = {name: [] for name in planners}
+    wins = {'player': 0, 'rinzler': 0}
+    tick = 0
+    while tick < ticks:
+        state = GameState(random.Random(rng.random()))
+        ais = {name: make() for name, make in planners.items()}
+        while tick < ticks:
+            tick += 1
+            direction = player_bot(state, rng)
+            player = advance(state.player, direction)
+            for name, ai in ais.items():
+                start = time.perf_counter()
+                move = move_rinzler(state.rinzler, player, state.player_trail, state.rinzler_trail, state.obstacles, state.occupancy, ai)
+                timings[name] += time.perf_counter() - start
+                decisions[name].append(move)
+            winner = step(state, direction, rinzler_action=decisions[next(iter(planners))][-1])
+            if winner:
+                wins[winner] += 1
+                break
+        for ai in ais.values():
+            shutdown_ai(ai)
+    return timings, decisions, wins
+
+def bench_incremental_planner(ticks=3000):
+    print(f"Planner cost over a {ticks}-tick match")
+    planners = {'field': lambda: create_ai('chase', 'field', False), 'incremental': lambda: create_ai('chase', 'incremental', False)}
+    timings, decisions, _ = simulate_match(ticks, 0, planners)
+    agree = sum(a == b for a, b in zip(decisions['field'], decisions['incremental']))
+    for name, total in timings.items():
+        print(f"{name:>12}: {total * 1000 / ticks:8.3f} ms/tick")
+    print(f"{'agreement':>12}: {agree}/{ticks} ticks chose the same move")
+
+def bench_bounded_lookahead(ticks=3000):
+    print("Per-tick AI cost vs distance to the player (open board)")
+    print(f"{'distance':>8} {'4x a_star':>12} {'field':>12} {'bounded':>12}")
+    player, rinzler, trail, obstacles = make_board(0)
+    occupancy = create_occupancy(GRID_SIZE)
+    for distance in (2, 8, 16, 28):
+        player = Lightcycle(RINZLER_INITIAL_X, RINZLER_INITIAL_Y + distance)
+        row = []
+        for evaluate in (
+            lambda: evaluate_with_a_star(rinzler, player, [], [], [], occupancy),
+            lambda: evaluate_future_moves(rinzler, player, [], [], [], occupancy=occupancy),
+            lambda: move_rinzler(rinzler, player, [], [], [], occupancy, create_ai('chase', 'field', True)),
+        ):
+            start = time.perf_counter()
+            for _ in range(TICKS):
+                evaluate()
+            row.append((time.perf_counter() - start) * 1000 / TICKS)
+        print(f"{distance:>8} " + " ".join(f"{ms:>10.3f}ms" for ms in row))
+
+    planners = {'field': lambda: create_ai('chase', 'field', False), 'bounded': lambda: create_ai('chase', 'field', True)}
+    timings, decisions, _ = simulate_match(ticks, 0, planners)
+    agree = sum(a == b for a, b in zip(decisions['field'], decisions['bounded']))
+    print(f"Over a {ticks}-tick match: field {timings['field'] * 1000 / ticks:.3f} ms/tick, "
+          f"bounded {timings['bounded'] * 1000 / ticks:.3f} ms/tick, {agree}/{ticks} same moves")
+
+def bench_territory(sizes=(32, 64, 128, 256), repeats=5):
+    print(f"Territory evaluation of all four moves (frame budget {MAX_SPEED * 1000:.0f} ms)")
+    print(f"{'arena':>8} {'ms/tick':>10}")
+    rng = random.Random(0)
+    for size in sizes:
+        occupancy = bytearray(size * size)
+        # Same obstacle density as the default arena: ~3% of cells blocked
+        for _ in range(size * size // 32):
+            occupancy[rng.randrange(size * size)] = 1
+        rinzler = Lightcycle(size // 2, 1)
+        player = Lightcycle(size // 2, size - 2)
+        occupancy[rinzler.y * size + rinzler.x] = 1
+        occupancy[player.y * size + player.x] = 0
+        start = time.perf_counter()
+        for _ in range(repeats):
+            evaluate_territory_moves(rinzler, player, occupancy, size)
+        ms = (time.perf_counter() - start) * 1000 / repeats
+        print(f"{size:>4}x{size:<3} {ms:>10.2f}")
+
+def bench_alphabeta(positions=20):
+    print("Iterative-deepening alpha-beta under a per-tick deadline")
+    print(f"{'budget':>8} {'avg depth':>10} {'nodes/s':>10} {'worst overrun':>14}")
+    for frame in (0.3, 0.15, MAX_SPEED):
+        budget = frame * SEARCH_TIME_FRACTION
+        depths, nodes, elapsed, overrun = 0, 0, 0.0, 0.0
+        for seed in range(positions):
+            player, rinzler, trail, obstacles = make_board(seed * 10, seed)
+            occupancy = build_occupancy([], trail, obstacles)
+            ai = create_ai('alphabeta')
+            ai['budget'] = budget
+            start = time.perf_counter()
+            move_rinzler(rinzler, player, [], trail, obstacles, occupancy, ai)
+            took = time.perf_counter() - start
+            depths += ai['search_depth']
+            nodes += ai['nodes']
+            elapsed += took
+            overrun = max(overrun, took - budget)
+        print(f"{budget * 1000:>6.0f}ms {depths / positions:>10.1f} {nodes / elapsed:>10.0f} {overrun * 1000:>12.2f}ms")
+
+def bench_transposition_table(positions=20):
+    budget = MAX_SPEED * SEARCH_TIME_FRACTION
+    print(f"Alpha-beta with and without the transposition table ({budget * 1000:.0f} ms budget)")
+    print(f"{'table':>8} {'avg depth':>10} {'avg nodes':>10} {'hit rate':>9} {'cutoffs':>8} {'replaced':>9}")
+    for use_table in (False, True):
+        depths = nodes = hits = probes = cutoffs = replacements = 0
+        for seed in range(positions):
+            player, rinzler, trail, obstacles = make_board(seed * 10, seed)
+            occupancy = build_occupancy([], trail, obstacles)
+            ai = create_ai('alphabeta')
+            if not use_table:
+                ai['table'] = None
+            ai['budget'] = budget
+            move_rinzler(rinzler, player, [], trail, obstacles, occupancy, ai)
+            depths += ai['search_depth']
+            nodes += ai['nodes']
+            if use_table:
+                table = ai['table']
+                hits, probes = hits + table.hits, probes + table.probes
+                cutoffs, replacements = cutoffs + table.cutoffs, replacements + table.replacements
+        hit_rate = f"{hits / probes:>8.1%}" if probes else f"{'-':>8}"
+        print(f"{'on' if use_table else 'off':>8} {depths / positions:>10.1f} {nodes / positions:>10.0f} {hit_rate:>9} {cutoffs:>8} {replacements:>9}")
+
+def bench_mcts(ticks=300):
+    budget = MAX_SPEED * SEARCH_TIME_FRACTION
+    print(f"MCTS vs distance-field chase over {ticks} ticks ({budget * 1000:.0f} ms MCTS budget)")
+    print(f"{'strategy':>10} {'wins':>5} {'losses':>7} {'CPU s/win':>10}")
+    # The pool's CPU time is workers x wall time spent waiting on them
+    for name, make_ai, cpus in (
+        ('chase', lambda: create_ai('chase', 'field', False), 1),
+        ('mcts', lambda: dict(create_ai('mcts'), budget=budget), MCTS_WORKERS),
+    ):
+        timings, _, wins = simulate_match(ticks, 1, {name: make_ai})
+        cpu = timings[name] * cpus
+        per_win = f"{cpu / wins['rinzler']:>10.2f}" if wins['rinzler'] else f"{'-':>10}"
+        print(f"{name:>10} {wins['rinzler']:>5} {wins['player']:>7} {per_win}")
+
+    player, rinzler, trail, obstacles = make_board(100)
+    occupancy = build_occupancy([], trail, obstacles)
+    ai = dict(create_ai('mcts'), budget=budget)
+    move = move_rinzler(rinzler, player, [], trail, obstacles, occupancy, ai)
+    shutdown_ai(ai)
+    print(f"One frame on {MCTS_WORKERS} worker(s): {ai['rollouts']} rollouts, "
+          f"{ai['rollouts_per_sec']:.0f} rollouts/sec, visits {ai['visits']}, chose {move}")
+
+def bench_pondering(ticks=150, strategy='alphabeta'):
+    # Mirrors main()'s frame loop at MAX_SPEED and measures how long each frame waits on the AI
+    print(f"Frame latency spent on the AI ({strategy}, {MAX_SPEED * 1000:.0f} ms frames)")
+    print(f"{'ponder':>8} {'avg ms':>8} {'max ms':>8} {'hit rate':>9}")
+    for ponder in (False, True):
+        rng = random.Random(2)
+        state = GameState(random.Random(2))
+        ai = create_ai(strategy, zobrist=state.zobrist)
+        ponderer = Ponderer() if ponder else None
+        latencies = []
+        for _ in range(ticks):
+            frame_start = time.perf_counter()
+            direction = player_bot(state, rng)
+            move = ponderer.take(state, direction) if ponderer else None
+            ai['budget'] = MAX_SPEED * SEARCH_TIME_FRACTION
+            if move is None:
+                move = move_rinzler(state.rinzler, advance(state.player, direction), state.player_trail,
+                                    state.rinzler_trail, state.obstacles, state.occupancy, ai)
+            latencies.append(time.perf_counter() - frame_start)
+            if step(state, direction, rinzler_action=move):
+                break
+            if ponderer:
+                ponderer.start(state, ai)
+            time.sleep(max(MAX_SPEED - (time.perf_counter() - frame_start), 0))
+        if ponderer:
+            ponderer.stop()
+        shutdown_ai(ai)
+        hit_rate = f"{ponderer.hits / max(ponderer.hits + ponderer.misses, 1):>8.0%}" if ponderer else f"{'-':>8}"
+        print(f"{'on' if ponder else 'off':>8} {sum(latencies) * 1000 / len(latencies):>8.2f} {max(latencies) * 1000:>8.2f} {hit_rate:>9}")
+
+def bench_headless(ticks=100000):
+    # Raw engine throughput: step() with Rinzler's moves supplied, then with the default AI
+    print("Headless engine throughput")
+    for label, use_ai in (("step only", False), ("step + chase AI", True)):
+        rng = random.Random(3)
+        done = 0
+        limit = ticks if not use_ai else ticks // 50
+        start = time.perf_counter()
+        while done < limit:
+            state = GameState(random.Random(rng.random()))
+            ai = create_ai('chase', 'field', False, zobrist=state.zobrist)
+            while done < limit:
+                done += 1
+                rinzler_action = None if use_ai else rng.choice(['UP', 'DOWN', 'LEFT', 'RIGHT'])
+                if step(state, player_bot(state, rng), ai, rinzler_action):
+                    break
+        print(f"{label:>16}: {done / (time.perf_counter() - start):>10.0f} ticks/sec")
+
+def bench_batch(batch_sizes=(1, 10, 100, 1000), ticks=200):
+    # Match-ticks per second of the bit-parallel batch engine against one step() loop
+    # driving the same number of matches, all with built-in policies on both sides
+    print("Batch simulator throughput (match-ticks/sec)")
+    print(f"{'matches':>8} {'step loop':>12} {'batch':>12} {'speedup':>9}")
+    for n in batch_sizes:
+        rng = random.Random(4)
+        states = [GameState(random.Random(rng.random())) for _ in range(n)]
+        done = 0
+        start = time.perf_counter()
+        for _ in range(ticks):
+            for state in states:
+                if state.winner is None:
+                    rinzler_action = cycle_bot(state, state.rinzler, state.rinzler_direction, rng)
+                    step(state, player_bot(state, rng), rinzler_action=rinzler_action)
+                    done += 1
+        looped = done / (time.perf_counter() - start)
+
+        game = BatchGame(n, seed=4)
+        done = 0
+        start = time.perf_counter()
+        while game.running and game.tick < ticks:
+            done += game.running
+            game.step()
+        batched = done / (time.perf_counter() - start)
+        print(f"{n:>8} {looped:>12.0f} {batched:>12.0f} {batched / looped:>8.1f}x")
+
+def update_dict_trail(trail, lightcycle, trail_length):
+    # The pre-CellList trail: one dict per cell in a list
+    trail.append({'x': lightcycle.x, 'y': lightcycle.y, 'symbol': lightcycle.trail_symbol})
+    if len(trail) > trail_length:
+        trail.pop(0)
+
+def bench_compact_types(lengths=(100, 1000, 10000), ticks=20000):
+    # Memory held by a full trail and the cost of one update, dict list versus CellList
+    print("Trail representation: list of dicts vs CellList")
+    print(f"{'trail':>8} {'dict B/cell':>12} {'array B/cell':>13} {'dict us/tick':>13} {'array us/tick':>14}")
+    cycles = [Lightcycle(x % (GRID_SIZE - 2) + 1, x // (GRID_SIZE - 2) % (GRID_SIZE - 2) + 1)
+              for x in range((GRID_SIZE - 2) ** 2)]
+    for length in lengths:
+        results = {}
+        for label, trail, update in (("dict", [], update_dict_trail), ("array", CellList(), update_trail)):
+            tracemalloc.start()
+            for i in range(length):
+                update(trail, cycles[i % len(cycles)], length)
+            size, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            start = time.perf_counter()
+            for i in range(ticks):
+                update(trail, cycles[i % len(cycles)], length)
+            results[label] = (size / length, (time.perf_counter() - start) * 1e6 / ticks)
+        print(f"{length:>8} {results['dict'][0]:>12.1f} {results['array'][0]:>13.1f} "
+              f"{results['dict'][1]:>13.2f} {results['array'][1]:>14.2f}")
+
+def bench_ring_trail(lengths=(20, 1000, 10000, 100000), ticks=20000):
+    # update_trail and membership cost for a CellList (expiry shifts the buffers) versus a Trail ring
+    print("Trail expiry and membership: CellList vs ring-buffer Trail")
+    print(f"{'trail':>8} {'list us/tick':>13} {'ring us/tick':>13} {'list us/in':>11} {'ring us/in':>11}")
+    cycles = [Lightcycle(x % (GRID_SIZE - 2) + 1, x // (GRID_SIZE - 2) % (GRID_SIZE - 2) + 1)
+              for x in range((GRID_SIZE - 2) ** 2)]
+    for length in lengths:
+        results = {}
+        for label, trail in (("list", CellList()), ("ring", Trail(length))):
+            occupancy = create_occupancy(GRID_SIZE)
+            for i in range(length):
+                update_trail(trail, cycles[i % len(cycles)], length, occupancy)
+            start = time.perf_counter()
+            for i in range(ticks):
+                update_trail(trail, cycles[i % len(cycles)], length, occupancy)
+            per_tick = (time.perf_counter() - start) * 1e6 / ticks
+            probes = min(ticks, 2000)
+            start = time.perf_counter()
+            for i in range(probes):
+                (i % GRID_SIZE, GRID_SIZE - 1) in trail  # Never on the trail: a full scan for CellList
+            results[label] = (per_tick, (time.perf_counter() - start) * 1e6 / probes)
+        print(f"{length:>8} {results['list'][0]:>13.2f} {results['ring'][0]:>13.2f} "
+              f"{results['list'][1]:>11.2f} {results['ring'][1]:>11.2f}")
+
+def bench_stamped(lengths=(20, 1000, 100000), ticks=20000, games=300):
+    # Per-tick collision check plus trail update, Trail and occupancy versus StampedBoard,
+    # then whole matches through step() in each mode
+    print("Trail bookkeeping: Trail + occupancy vs StampedBoard (us/tick)")
+    print(f"{'trail':>8} {'buffer':>10} {'stamped':>10}")
+    cycles = [Lightcycle(x % (GRID_SIZE - 2) + 1, x // (GRID_SIZE - 2) % (GRID_SIZE - 2) + 1)
+              for x in range((GRID_SIZE - 2) ** 2)]
+    for length in lengths:
+        trail, occupancy = Trail(length), create_occupancy(GRID_SIZE)
+        start = time.perf_counter()
+        for i in range(ticks):
+            cycle = cycles[i % len(cycles)]
+            check_collision(cycle, [trail], [], occupancy)
+            update_trail(trail, cycle, length, occupancy)
+        buffered = (time.perf_counter() - start) * 1e6 / ticks
+        board = StampedBoard([], length, length)
+        start = time.perf_counter()
+        for i in range(ticks):
+            cycle = cycles[i % len(cycles)]
+            board.is_solid(cycle.x, cycle.y)
+            board.paint(cycle.x, cycle.y, Owner.PLAYER, cycle.trail_symbol, i + 1)
+        stamped = (time.perf_counter() - start) * 1e6 / ticks
+        print(f"{length:>8} {buffered:>10.2f} {stamped:>10.2f}")
+
+    print("Whole matches through step() (ticks/sec)")
+    for label, use_ai in (("step only", False), ("step + chase AI", True)):
+        row = []
+        for mode in ('buffer', 'stamped'):
+            rng = random.Random(5)
+            done = 0
+            start = time.perf_counter()
+            for _ in range(games if not use_ai else games // 10):
+                state = GameState(random.Random(rng.random()), mode)
+                ai = create_ai('chase', 'field', False, zobrist=state.zobrist)
+                while state.winner is None and state.tick < 500:
+                    rinzler_action = None if use_ai else cycle_bot(state, state.rinzler, state.rinzler_direction, rng)
+                    step(state, player_bot(state, rng), ai, rinzler_action)
+                    done += 1
+            row.append(f"{mode} {done / (time.perf_counter() - start):>9.0f}")
+        print(f"{label:>16}: " + "   ".join(row))
+
+def bench_dead_ends(matches=100, max_ticks=1500):
+    # Chase AI against the random player bot with and without dead-end pruning
+    print("Dead-end pruning: chase AI vs the player bot")
+    print(f"{'pruning':>8} {'rinzler wins':>13} {'ms/tick':>9} {'worst ms':>9}")
+    for dead_ends in (False, True):
+        wins = ticks = 0
+        total = worst = 0.0
+        for seed in range(matches):
+            state = GameState(random.Random(seed))
+            rng = random.Random(seed + matches)
+            ai = create_ai('chase', 'field', False, zobrist=state.zobrist, dead_ends=dead_ends)
+            while state.winner is None and state.tick < max_ticks:
+                start = time.perf_counter()
+                step(state, player_bot(state, rng), ai)
+                elapsed = time.perf_counter() - start
+                total += elapsed
+                worst = max(worst, elapsed)
+                ticks += 1
+            wins += state.winner == 'rinzler'
+        print(f"{'on' if dead_ends else 'off':>8} {wins:>6}/{matches:<6} {total * 1000 / ticks:>9.3f} {worst * 1000:>9.2f}")
+
+def bench_classic(bucket=100):
+    # One cycle snakes through all 900 open cells with a trail that never expires. Per
+    # tick cost of a linear scan of a CellList, the occupancy/Trail path, the StampedBoard
+    # path and a chase AI query from the last open cell, averaged over each `bucket` cells.
+    print("Classic mode: per-tick cost as the arena fills (us)")
+    print(f"{'cells':>9} {'scan':>9} {'buffer':>9} {'stamped':>9} {'AI':>9}")
+    cells = [(x if y % 2 else GRID_SIZE - 1 - x, y) for y in range(1, GRID_SIZE - 1) for x in range(1, GRID_SIZE - 1)]
+    capacity = GRID_SIZE * GRID_SIZE
+    trail, occupancy, scanned_trail = Trail(capacity), create_occupancy(GRID_SIZE), CellList()
+    board = StampedBoard([], capacity, capacity)
+    rinzler = Lightcycle(*cells[-1])
+    ai = create_ai('chase', 'field', False)
+    totals = [0.0] * 4
+    for tick, (x, y) in enumerate(cells[:-1], 1):
+        cycle = Lightcycle(x, y)
+        start = time.perf_counter()
+        check_collision(cycle, [scanned_trail], [])
+        scanned_trail.append(x, y, cycle.trail_symbol)
+        scanned = time.perf_counter()
+        check_collision(cycle, [trail], [], occupancy)
+        update_trail(trail, cycle, capacity, occupancy)
+        buffered = time.perf_counter()
+        board.is_solid(x, y)
+        board.paint(x, y, Owner.PLAYER, cycle.trail_symbol, tick)
+        stamped = time.perf_counter()
+        move_rinzler(rinzler, cycle, trail, [], [], occupancy, ai)
+        queried = time.perf_counter()
+        for i, elapsed in enumerate((scanned - start, buffered - scanned, stamped - buffered, queried - stamped)):
+            totals[i] += elapsed
+        if tick % bucket == 0 or tick == len(cells) - 1:
+            count = bucket if tick % bucket == 0 else tick % bucket
+            print(f"{tick - count + 1:>4}-{tick:<4} " + " ".join(f"{total * 1e6 / count:>9.1f}" for total in totals))
+            totals = [0.0] * 4
+
+def bench_arena_sizes(matches=5, max_ticks=2000):
+    # Player bot against the chase AI on growing arenas: time per tick, peak memory of
+    # building and playing a match (the game state alone, then with the AI's planners)
+    # and what a flat bytearray per cell would need
+    print("Arena size: per-tick cost and memory")
+    print(f"{'size':>6} {'us/tick':>9} {'state KB':>9} {'with AI KB':>11} {'solid':>7} {'dense KB':>9}")
+    for size in (32, 64, 128, 256, 512, 1024):
+        ticks = 0
+        elapsed = 0.0
+        for seed in range(matches):
+            state = GameState(random.Random(seed), size=size)
+            rng = random.Random(seed + matches)
+            ai = create_ai('chase', 'field', False, zobrist=state.zobrist)
+            start = time.perf_counter()
+            while state.winner is None and state.tick < max_ticks:
+                step(state, player_bot(state, rng), ai)
+            elapsed += time.perf_counter() - start
+            ticks += state.tick
+        peaks = []
+        for with_ai in (False, True):
+            tracemalloc.start()
+            state = GameState(random.Random(0), size=size)
+            rng = random.Random(matches)
+            while state.winner is None and state.tick < max_ticks:
+                direction = player_bot(state, rng)
+                if with_ai:
+                    step(state, direction)
+                else:
+                    player = advance(state.player, next_direction(state.player_direction, direction))
+                    step(state, direction, rinzler_action=evaluate_local_moves(state.rinzler, player, state.occupancy, size))
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        solid = sum(1 for count in state.occupancy if count) if isinstance(state.occupancy, bytearray) else len(state.occupancy)
+        print(f"{size:>6} {elapsed * 1e6 / ticks:>9.1f} {peaks[0] / 1024:>9.1f} {peaks[1] / 1024:>11.1f} {solid:>7} "
+              f"{size * size / 1024:>9.1f}")
+
+def snake(size, run):
+    # Lightcycles snaking through bands `run` columns wide: rows of run cells joined by
+    # single vertical steps, like a long-lived cycle making occasional turns
+    cycles = []
+    for band in range((size - 2) // run):
+        rows = range(1, size - 1) if band % 2 == 0 else range(size - 2, 0, -1)
+        for i, y in enumerate(rows):
+            xs = range(band * run + 1, band * run + run + 1)
+            for j, x in enumerate(xs if i % 2 == 0 else reversed(xs)):
+                turned = j == 0 and i > 0
+                symbols = (Symbol.VERTICAL, Symbol.TRAIL_VERTICAL) if turned else (Symbol.HORIZONTAL, Symbol.TRAIL_HORIZONTAL)
+                cycles.append(Lightcycle(x, y, *symbols))
+    return cycles
+
+def bench_segments(size=1024, run=256, lengths=(1000, 10000, 100000, 500000), ticks=20000):
+    # A long trail on a big arena: Trail plus sparse occupancy counts versus a
+    # SegmentTrail. Memory held, update_trail and membership cost.
+    print(f"Segment trails on a {size}x{size} arena, turning every {run} cells")
+    print(f"{'trail':>8} {'ring KB':>10} {'runs KB':>10} {'ring us/tick':>13} {'runs us/tick':>13} {'ring us/in':>11} {'runs us/in':>11}")
+    cycles = snake(size, run)
+    for length in lengths:
+        results = {}
+        for label in ("ring", "runs"):
+            tracemalloc.start()
+            if label == "ring":
+                trail, occupancy = Trail(length, size), create_occupancy(size)
+            else:
+                trail, occupancy = SegmentTrail(), None
+            for cycle in cycles[:length]:
+                update_trail(trail, cycle, length, occupancy, size=size)
+            held = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            start = time.perf_counter()
+            for cycle in cycles[length:length + ticks]:
+                update_trail(trail, cycle, length, occupancy, size=size)
+            per_tick = (time.perf_counter() - start) * 1e6 / ticks
+            probes = cycles[length + ticks - 1000:length + ticks + 1000]
+            start = time.perf_counter()
+            for cycle in probes:
+                (cycle.x, cycle.y) in trail
+            results[label] = (held / 1024, per_tick, (time.perf_counter() - start) * 1e6 / len(probes))
+        print(f"{length:>8} {results['ring'][0]:>10.1f} {results['runs'][0]:>10.1f} {results['ring'][1]:>13.2f} "
+              f"{results['runs'][1]:>13.2f} {results['ring'][2]:>11.2f} {results['runs'][2]:>11.2f}")
+
+def bench_hpa(sizes=(128, 256, 512, 1024), matches=10, max_ticks=2000):
+    # Big-arena chase: the local lookahead versus HPA* (which move_rinzler picks from
+    # HPA_ARENA_SIZE up), with the one-off crossing scan timed separately
+    print("HPA* on big arenas: chase AI vs the player bot")
+    print(f"{'size':>6} {'build ms':>9} {'planner':>8} {'rinzler wins':>13} {'ms/tick':>9} {'worst ms':>9} {'rebuilt/tick':>13}")
+    for size in sizes:
+        state = GameState(random.Random(0), size=size)
+        start = time.perf_counter()
+        HierarchicalPlanner(state.occupancy, size)
+        build = (time.perf_counter() - start) * 1000
+        for planner in ('local', 'hpa'):
+            wins = ticks = rebuilt = 0
+            total = worst = 0.0
+            for seed in range(matches):
+                state = GameState(random.Random(seed), size=size)
+                rng = random.Random(seed + matches)
+                ai = create_ai('chase', 'field', False)
+                if planner == 'hpa':
+                    step(state, player_bot(state, rng), ai)  # Builds the planner, timed above
+                while state.winner is None and state.tick < max_ticks:
+                    direction = player_bot(state, rng)
+                    start = time.perf_counter()
+                    if planner == 'local':
+                        player = advance(state.player, next_direction(state.player_direction, direction))
+                        step(state, direction, ai, evaluate_local_moves(state.rinzler, player, state.occupancy, size))
+                    else:
+                        step(state, direction, ai)
+                    elapsed = time.perf_counter() - start
+                    total += elapsed
+                    worst = max(worst, elapsed)
+                    ticks += 1
+                wins += state.winner == 'rinzler'
+                rebuilt += ai['hpa'].rebuilt if ai['hpa'] else 0
+            print(f"{size:>6} {build:>9.1f} {planner:>8} {wins:>6}/{matches:<6} {total * 1000 / ticks:>9.3f} "
+                  f"{worst * 1000:>9.2f} {rebuilt / ticks:>13.2f}")
+
+def bench_jps(trail_lengths=(0, 20, 100, 400), queries=300):
+    # a_star versus jump_point_search between random open cells of make_board boards:
+    # average nodes expanded and time per search; the path lengths must match
+    print("Jump Point Search vs A* (per search)")
+    print(f"{'trail':>8} {'A* nodes':>9} {'JPS nodes':>10} {'A* us':>9} {'JPS us':>9}")
+    for trail_length in trail_lengths:
+        _, _, trail, obstacles = make_board(trail_length)
+        occupancy = build_occupancy([], trail, obstacles)
+        rng = random.Random(trail_length)
+        open_cells = [(x, y) for y in range(1, GRID_SIZE - 1) for x in range(1, GRID_SIZE - 1)
+                      if not occupancy[y * GRID_SIZE + x]]
+        pairs = [(rng.choice(open_cells), rng.choice(open_cells)) for _ in range(queries)]
+        results = {}
+        for label, search in (("a_star", a_star), ("jps", jump_point_search)):
+            stats = {'expanded': 0}
+            lengths = []
+            start = time.perf_counter()
+            for a, b in pairs:
+                lengths.append(len(search(a, b, [], trail, obstacles, occupancy, stats)))
+            results[label] = (stats['expanded'] / queries, (time.perf_counter() - start) * 1e6 / queries, lengths)
+        assert results['a_star'][2] == results['jps'][2], "JPS path lengths differ from A*"
+        print(f"{trail_length:>8} {results['a_star'][0]:>9.1f} {results['jps'][0]:>10.1f} "
+              f"{results['a_star'][1]:>9.1f} {results['jps'][1]:>9.1f}")
+
+def bench_alt(maps=20, queries=100, obstacle_counts=(OBSTACLE_COUNT, 40, 80)):
+    # a_star with the Manhattan heuristic versus ALT landmarks, on freshly generated maps
+    # (obstacles only, as the tables see them) between random open cells. 'detour' only
+    # counts queries whose shortest path is longer than the Manhattan distance.
+    print("ALT landmarks vs Manhattan for a_star (nodes expanded per search)")
+    print(f"{'obstacles':>10} {'build ms':>9} {'cached us':>10} {'manhattan':>10} {'ALT':>8} "
+          f"{'detour':>7} {'manhattan':>10} {'ALT':>8} {'us/search':>10} {'ALT us':>8}")
+    for count in obstacle_counts:
+        build = cached = elapsed = alt_elapsed = 0.0
+        totals = [0, 0]
+        detours = [0, 0]
+        searches = detour_searches = 0
+        for seed in range(maps):
+            occupancy = create_occupancy(GRID_SIZE)
+            obstacles = place_obstacles(None, count, occupancy, random.Random(seed))
+            start = time.perf_counter()
+            landmarks = landmark_tables(obstacles)
+            build += time.perf_counter() - start
+            start = time.perf_counter()
+            landmark_tables(obstacles)
+            cached += time.perf_counter() - start
+            rng = random.Random(seed + maps)
+            open_cells = [(x, y) for y in range(GRID_SIZE) for x in range(GRID_SIZE) if not occupancy[y * GRID_SIZE + x]]
+            for _ in range(queries):
+                a, b = rng.choice(open_cells), rng.choice(open_cells)
+                plain, alt = {'expanded': 0}, {'expanded': 0}
+                start = time.perf_counter()
+                path = a_star(a, b, [], [], obstacles, occupancy, plain)
+                elapsed += time.perf_counter() - start
+                start = time.perf_counter()
+                assert len(a_star(a, b, [], [], obstacles, occupancy, alt, landmarks)) == len(path)
+                alt_elapsed += time.perf_counter() - start
+                searches += 1
+                totals[0] += plain['expanded']
+                totals[1] += alt['expanded']
+                if len(path) > abs(a[0] - b[0]) + abs(a[1] - b[1]):
+                    detour_searches += 1
+                    detours[0] += plain['expanded']
+                    detours[1] += alt['expanded']
+        detour_searches = max(detour_searches, 1)
+        print(f"{count:>10} {build * 1000 / maps:>9.2f} {cached * 1e6 / maps:>10.1f} {totals[0] / searches:>10.1f} "
+              f"{totals[1] / searches:>8.1f} {detour_searches:>7} {detours[0] / detour_searches:>10.1f} "
+              f"{detours[1] / detour_searches:>8.1f} {elapsed * 1e6 / searches:>10.1f} {alt_elapsed * 1e6 / searches:>8.1f}")
+
+def bench_plan_reuse(matches=200, max_ticks=1500):
+    # Chase AI against the player bot with plan reuse off and on: AI time per tick and
+    # per match, replans per tick and Rinzler's wins
+    print("Plan reuse: chase AI vs the player bot")
+    print(f"{'reuse':>6} {'rinzler wins':>13} {'AI us/tick':>11} {'AI ms/match':>12} {'replans/tick':>13}")
+    baseline = None
+    for reuse in (False, True):
+        wins = ticks = replans = 0
+        spent = 0.0
+        for seed in range(matches):
+            state = GameState(random.Random(seed))
+            rng = random.Random(seed + matches)
+            ai = create_ai('chase', 'field', False, reuse=reuse)
+            while state.winner is None and state.tick < max_ticks:
+                direction = player_bot(state, rng)
+                player = advance(state.player, next_direction(state.player_direction, direction))
+                start = time.perf_counter()
+                move = move_rinzler(state.rinzler, player, state.player_trail, state.rinzler_trail, state.obstacles,
+                                    state.occupancy, ai)
+                spent += time.perf_counter() - start
+                step(state, direction, ai, move)
+                ticks += 1
+            wins += state.winner == 'rinzler'
+            replans += ai['replans'] if reuse else state.tick
+        print(f"{'on' if reuse else 'off':>6} {wins:>6}/{matches:<6} {spent * 1e6 / ticks:>11.1f} "
+              f"{spent * 1000 / matches:>12.2f} {replans / ticks:>13.2f}")
+        if baseline is None:
+            baseline = spent / ticks
+    print(f"AI CPU saved per tick: {100 * (1 - spent / ticks / baseline):.0f}%")
+
+def bench_swarm(matches=20, max_ticks=2000, counts=(1, 8, 16, 32, 64)):
+    # One player against n chasers: AI time per tick with a shared flow field against
+    # one evaluate_future_moves per chaser, and who won
+    print("Swarm: chaser AI cost vs number of chasers")
+    print(f"{'chasers':>8} {'flow us/tick':>13} {'chase us/tick':>14} {'speedup':>8} {'flow wins':>10} {'chase wins':>11}")
+    for n in counts:
+        costs = {}
+        wins = {}
+        for policy in ('flow', 'chase'):
+            ticks = won = 0
+            spent = 0.0
+            for seed in range(matches):
+                game = SwarmGame(n, seed, policy)
+                won += game.run(max_ticks) == 'chasers'
+                ticks += game.tick
+                spent += game.ai_time
+            costs[policy] = spent * 1e6 / ticks
+            wins[policy] = won
+        print(f"{n:>8} {costs['flow']:>13.1f} {costs['chase']:>14.1f} {costs['chase'] / costs['flow']:>7.1f}x "
+              f"{wins['flow']:>4}/{matches:<5} {wins['chase']:>5}/{matches:<5}")
+
+def bench_parallel_chase(matches=20, max_ticks=1000):
+    # The chase AI scoring its candidates inline and on the process pool, on the same
+    # board states. One AI of each kind serves every match, so the pool is started once.
+    print(f"Parallel chase: candidates scored inline vs on {MCTS_WORKERS} worker(s)")
+    ais = {'serial': create_ai('chase', 'field', False, reuse=False),
+           'parallel': create_ai('chase', 'field', False, reuse=False, parallel=True)}
+    timings = {name: 0.0 for name in ais}
+    agree = ticks = 0
+    for seed in range(matches):
+        state = GameState(random.Random(seed))
+        rng = random.Random(seed + matches)
+        while state.winner is None and state.tick < max_ticks:
+            direction = player_bot(state, rng)
+            player = advance(state.player, next_direction(state.player_direction, direction))
+            moves = {}
+            for name, ai in ais.items():
+                start = time.perf_counter()
+                moves[name] = move_rinzler(state.rinzler, player, state.player_trail, state.rinzler_trail,
+                                           state.obstacles, state.occupancy, ai)
+                timings[name] += time.perf_counter() - start
+            agree += moves['serial'] == moves['parallel']
+            ticks += 1
+            step(state, direction, rinzler_action=moves['serial'])
+    shutdown_ai(ais['parallel'])
+    for name, total in timings.items():
+        print(f"{name:>12}: {total * 1e6 / ticks:8.1f} us/tick")
+    print(f"{'agreement':>12}: {agree}/{ticks} ticks chose the same move, {ais['parallel']['late']} decided past the budget")
+
+def bench_trail_scaling():
+    print("Ticks/sec vs trail length")
+    print(f"{'trail':>8} {'rebuilt':>12} {'shared':>12}")
+    for trail_length in TRAIL_LENGTHS:
+        rebuilt = ticks_per_second(trail_length, shared_occupancy=False)
+        shared = ticks_per_second(trail_length, shared_occupancy=True)
+        print(f"{trail_length:>8} {rebuilt:>12.1f} {shared:>12.1f}")
+
+if __name__ == "__main__":
+    bench_trail_scaling()
+    print()
+    bench_distance_field()
+    print()
+    bench_incremental_planner()
+    print()
+    bench_bounded_lookahead()
+    print()
+    bench_territory()
+    print()
+    bench_alphabeta()
+    print()
+    bench_transposition_table()
+    print()
+    bench_mcts()
+    print()
+    bench_pondering()
+    print()
+    bench_headless()
+    print()
+    bench_batch()
+    print()
+    bench_compact_types()
+    print()
+    bench_ring_trail()
+    print()
+    bench_stamped()
+    print()
+    bench_dead_ends()
+    print()
+    bench_classic()
+    print()
+    bench_arena_sizes()
+    print()
+    bench_segments()
+    print()
+    bench_hpa()
+    print()
+    bench_jps()
+    print()
+    bench_alt()
+    print()
+    bench_plan_reuse()
+    print()
+    bench_swarm()
+    print()
+    bench_parallel_chase()
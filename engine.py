@@ -0,0 +1,1887 @@
+import time
+import random
+import heapq
+import math
+import os
+import concurrent.futures
+import multiprocessing
+import threading
+from array import array
+from bisect import bisect_right, insort
+from collections import deque
+from enum import IntEnum
+from itertools import chain
+
+# Constants
+GRID_SIZE = 32
+PLAYER_INITIAL_X, PLAYER_INITIAL_Y = GRID_SIZE // 2, GRID_SIZE - 2
+RINZLER_INITIAL_X, RINZLER_INITIAL_Y = GRID_SIZE // 2, 1
+PLAYER_TRAIL_LENGTH = 20
+RINZLER_TRAIL_LENGTH = 30
+OBSTACLE_COUNT = 10
+INITIAL_SPEED = 0.3
+MAX_SPEED = 0.07
+SPEED_UP_DURATION = 3
+RINZLER_PLANNER = 'field'  # 'field' (fresh BFS each tick) or 'incremental' (IncrementalPlanner)
+BOUNDED_LOOKAHEAD = False  # Try a depth-bounded search first and only fall back to the planner when it is ambiguous
+RINZLER_STRATEGY = 'chase'  # 'chase' (path towards the player), 'territory' (Voronoi territory difference), 'alphabeta' or 'mcts'
+SEARCH_TIME_FRACTION = 0.5  # Share of each frame the alpha-beta search may spend
+SEARCH_MAX_DEPTH = 32
+WIN_SCORE = 1000000
+TT_SIZE = 1 << 16  # Transposition table slots (power of two)
+ZOBRIST_SEED = 2010
+MCTS_WORKERS = os.cpu_count() or 1
+MCTS_WORKER_SHARE = 0.8  # Share of the budget workers spend on rollouts; the rest covers process round trips
+MCTS_EXPLORATION = 1.4
+ROLLOUT_MAX_STEPS = 200
+MCTS_POLL_INTERVAL = 0.005
+PONDER = True  # Plan Rinzler's next move in the background during the frame sleep
+AVOID_DEAD_ENDS = True  # Skip chase moves into pockets smaller than DEAD_END_AREA cells
+DEAD_END_AREA = RINZLER_TRAIL_LENGTH
+CLASSIC_MODE = False  # Classic Tron: trails never expire
+TRAIL_MODE = 'buffer'  # 'buffer' (Trail ring buffers plus occupancy counts), 'stamped' (StampedBoard) or 'segments' (SegmentTrail)
+SPARSE_ARENA_SIZE = 64  # Arenas bigger than this keep cell counts in a SparseCounts dict instead of a bytearray
+TRAIL_CHUNK = 256  # Trails start with room for this many cells and grow as needed
+HPA_ARENA_SIZE = 128  # The chase AI plans with a HierarchicalPlanner on arenas at least this big
+HPA_CLUSTER_SIZE = 16  # Cells per side of an HPA* cluster
+LANDMARK_COUNT = 8  # ALT landmarks per map
+PLAN_REUSE = True  # The chase AI follows its last path until it is blocked or the player strays from its goal
+PLAN_TOLERANCE = 2  # Cells the player may stray from the plan's goal...
+PLAN_TOLERANCE_SHARE = 0.25  # ...plus this share of the plan's remaining length
+PLAN_MIN_LENGTH = 14  # Plans with fewer cells left are redone every tick; the close chase needs fresh paths
+LANDMARK_CACHE_SIZE = 64  # Maps whose landmark tables are kept
+PARALLEL_CHASE = False  # Score the chase AI's candidate moves concurrently on the AI's process pool
+DIRECTIONS = {'UP': (0, -1), 'DOWN': (0, 1), 'LEFT': (-1, 0), 'RIGHT': (1, 0)}
+OPPOSITE = {'UP': 'DOWN', 'DOWN': 'UP', 'LEFT': 'RIGHT', 'RIGHT': 'LEFT'}
+STEPS = {move: dy * GRID_SIZE + dx for move, (dx, dy) in DIRECTIONS.items()}  # Bit index change of each move on a GRID_SIZE bitboard
+
+class Symbol(IntEnum):
+    # Small codes stored with every cell; GLYPHS turns them back into characters
+    VERTICAL = 0
+    HORIZONTAL = 1
+    TRAIL_VERTICAL = 2
+    TRAIL_HORIZONTAL = 3
+
+GLYPHS = ('▮', '▬', '║', '═')
+SYMBOLS = {  # (cycle, trail)
+    'UP': (Symbol.VERTICAL, Symbol.TRAIL_VERTICAL), 'DOWN': (Symbol.VERTICAL, Symbol.TRAIL_VERTICAL),
+    'LEFT': (Symbol.HORIZONTAL, Symbol.TRAIL_HORIZONTAL), 'RIGHT': (Symbol.HORIZONTAL, Symbol.TRAIL_HORIZONTAL),
+}
+
+class Lightcycle:
+    __slots__ = ('x', 'y', 'symbol', 'trail_symbol')
+
+    def __init__(self, x, y, symbol=Symbol.VERTICAL, trail_symbol=Symbol.TRAIL_VERTICAL):
+        self.x = x
+        self.y = y
+        self.symbol = symbol
+        self.trail_symbol = trail_symbol
+
+class CellList:
+    # Trail or obstacle cells as parallel coordinate and symbol buffers, oldest first.
+    # Iterating yields (x, y, symbol) tuples.
+    __slots__ = ('xs', 'ys', 'symbols')
+
+    def __init__(self):
+        self.xs = array('h')
+        self.ys = array('h')
+        self.symbols = array('b')
+
+    def append(self, x, y, symbol):
+        self.xs.append(x)
+        self.ys.append(y)
+        self.symbols.append(symbol)
+
+    def popleft(self):
+        # Remove the oldest cell and return its (x, y)
+        self.symbols.pop(0)
+        return self.xs.pop(0), self.ys.pop(0)
+
+    def __len__(self):
+        return len(self.xs)
+
+    def __iter__(self):
+        return zip(self.xs, self.ys, self.symbols)
+
+    def __contains__(self, cell):
+        return any((x, y) == cell for x, y, _ in self)
+
+class SparseCounts(dict):
+    # Cell index -> count for big arenas, with the indexing of an occupancy bytearray.
+    # Only non-zero counts are stored, so memory follows the number of solid cells.
+    __slots__ = ()
+
+    def __missing__(self, i):
+        return 0
+
+    def __setitem__(self, i, count):
+        if count:
+            dict.__setitem__(self, i, count)
+        else:
+            self.pop(i, None)
+
+class Trail:
+    # Ring buffer of trail cells, oldest first, with the same interface as CellList. It
+    # holds up to `capacity` cells but only allocates them as the trail grows. A per-cell
+    # count makes append, popleft and `(x, y) in trail` O(1).
+    __slots__ = ('xs', 'ys', 'symbols', 'counts', 'start', 'length', 'capacity', 'size')
+
+    def __init__(self, capacity, size=GRID_SIZE):
+        room = min(capacity, TRAIL_CHUNK)
+        self.xs = array('h', [0]) * room
+        self.ys = array('h', [0]) * room
+        self.symbols = array('b', [0]) * room
+        self.counts = create_occupancy(size)
+        self.start = 0
+        self.length = 0
+        self.capacity = capacity
+        self.size = size
+
+    def grow(self):
+        # Unroll the ring into buffers twice as big (at most capacity)
+        start, room = self.start, len(self.xs)
+        extra = min(room, self.capacity - room)
+        self.xs = self.xs[start:] + self.xs[:start] + array('h', [0]) * extra
+        self.ys = self.ys[start:] + self.ys[:start] + array('h', [0]) * extra
+        self.symbols = self.symbols[start:] + self.symbols[:start] + array('b', [0]) * extra
+        self.start = 0
+
+    def append(self, x, y, symbol):
+        if self.length == len(self.xs):
+            if self.length == self.capacity:
+                raise IndexError("trail is full")
+            self.grow()
+        room = len(self.xs)
+        i = (self.start + self.length) % room
+        self.xs[i] = x
+        self.ys[i] = y
+        self.symbols[i] = symbol
+        self.length += 1
+        self.counts[y * self.size + x] += 1
+
+    def popleft(self):
+        # Remove the oldest cell and return its (x, y)
+        if not self.length:
+            raise IndexError("pop from an empty trail")
+        i = self.start
+        x, y = self.xs[i], self.ys[i]
+        self.start = (i + 1) % len(self.xs)
+        self.length -= 1
+        self.counts[y * self.size + x] -= 1
+        return x, y
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        start, end = self.start, self.start + self.length
+        capacity = len(self.xs)
+        if end <= capacity:
+            return zip(self.xs[start:end], self.ys[start:end], self.symbols[start:end])
+        end -= capacity
+        return chain(zip(self.xs[start:], self.ys[start:], self.symbols[start:]),
+                     zip(self.xs[:end], self.ys[:end], self.symbols[:end]))
+
+    def __contains__(self, cell):
+        x, y = cell
+        size = self.size
+        return 0 <= x < size and 0 <= y < size and self.counts[y * size + x] > 0
+
+class Owner(IntEnum):
+    EMPTY = 0
+    PLAYER = 1
+    RINZLER = 2
+    OBSTACLE = 3
+
+class StampedBoard:
+    # Trails without trail buffers: every cell keeps the tick it was last painted, who
+    # painted it and its symbol. A cell is solid while now - painted < that painter's
+    # trail length, where now is the last painted tick; obstacles never expire.
+    __slots__ = ('painted', 'owners', 'symbols', 'lengths', 'now', 'synced', 'size')
+
+    def __init__(self, obstacles, player_length=PLAYER_TRAIL_LENGTH, rinzler_length=RINZLER_TRAIL_LENGTH, size=GRID_SIZE):
+        self.painted = array('q', [0]) * (size * size)
+        self.owners = bytearray(size * size)
+        self.symbols = bytearray(size * size)
+        self.size = size
+        self.lengths = [0, player_length, rinzler_length, math.inf]  # Indexed by Owner
+        self.now = 0
+        self.synced = None
+        for x, y, symbol in obstacles:
+            self.paint(x, y, Owner.OBSTACLE, symbol, 0)
+
+    def paint(self, x, y, owner, symbol, tick):
+        # Two cycles can enter the same cell on one tick; the stamp that lasts longer wins
+        i = y * self.size + x
+        if self.painted[i] + self.lengths[self.owners[i]] <= tick + self.lengths[owner]:
+            self.painted[i] = tick
+            self.owners[i] = owner
+            self.symbols[i] = symbol
+        self.now = tick
+
+    def is_solid(self, x, y):
+        i = y * self.size + x
+        return self.now - self.painted[i] < self.lengths[self.owners[i]]
+
+    def sync(self, occupancy, zobrist=None):
+        # Rebuild the occupancy grid (and Zobrist hash) the AI reads, at most once per tick
+        if self.synced == self.now:
+            return
+        now, lengths = self.now, self.lengths
+        occupancy[:] = bytes(now - painted < lengths[owner] for painted, owner in zip(self.painted, self.owners))
+        if zobrist is not None:
+            zobrist['hash'] = zobrist_hash(occupancy)
+        self.synced = now
+
+class StampedTrail:
+    # One cycle's live cells on a StampedBoard, with the read side of the Trail interface
+    __slots__ = ('board', 'owner')
+
+    def __init__(self, board, owner):
+        self.board = board
+        self.owner = owner
+
+    def __iter__(self):
+        board = self.board
+        size = board.size
+        for i, owner in enumerate(board.owners):
+            if owner == self.owner and board.now - board.painted[i] < board.lengths[owner]:
+                yield i % size, i // size, board.symbols[i]
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __contains__(self, cell):
+        x, y = cell
+        size = self.board.size
+        return (0 <= x < size and 0 <= y < size
+                and self.board.owners[y * size + x] == self.owner and self.board.is_solid(x, y))
+
+class Segment:
+    # A straight run of trail cells: cells lo..hi of row `line` (horizontal) or column
+    # `line` (vertical). step is the direction the run grows in, 0 while it is one cell.
+    __slots__ = ('vertical', 'line', 'lo', 'hi', 'step', 'symbol')
+
+    def __init__(self, vertical, line, at, symbol):
+        self.vertical = vertical
+        self.line = line
+        self.lo = self.hi = at
+        self.step = 0
+        self.symbol = symbol
+
+    def __len__(self):
+        return self.hi - self.lo + 1
+
+def segment_start(segment):
+    return segment.lo
+
+class SegmentTrail:
+    # Trail cells as straight runs instead of one entry per cell, with the Trail
+    # interface. Each run is also filed under its row (horizontal) or column (vertical)
+    # in a list sorted by start, so `(x, y) in trail` is two binary searches. Memory
+    # follows the number of turns, not the trail length. Cells within one trail never
+    # repeat (that would be a crash), so runs in one row or column never overlap.
+    __slots__ = ('segments', 'rows', 'columns', 'length')
+
+    def __init__(self):
+        self.segments = deque()
+        self.rows = {}
+        self.columns = {}
+        self.length = 0
+
+    def append(self, x, y, symbol):
+        vertical = symbol in (Symbol.VERTICAL, Symbol.TRAIL_VERTICAL)
+        line, at = (x, y) if vertical else (y, x)
+        self.length += 1
+        if self.segments:
+            last = self.segments[-1]
+            if last.vertical == vertical and last.line == line and last.symbol == symbol:
+                if at == last.hi + 1 and last.step >= 0:
+                    last.hi, last.step = at, 1
+                    return
+                if at == last.lo - 1 and last.step <= 0:
+                    last.lo, last.step = at, -1
+                    return
+        segment = Segment(vertical, line, at, symbol)
+        self.segments.append(segment)
+        insort(self.index(segment).setdefault(line, []), segment, key=segment_start)
+
+    def popleft(self):
+        # Remove the oldest cell and return its (x, y)
+        if not self.length:
+            raise IndexError("pop from an empty trail")
+        segment = self.segments[0]
+        self.length -= 1
+        if segment.lo == segment.hi:
+            at = segment.lo
+            self.segments.popleft()
+            runs = self.index(segment)[segment.line]
+            runs.pop(bisect_right(runs, at, key=segment_start) - 1)
+            if not runs:
+                del self.index(segment)[segment.line]
+        elif segment.step < 0:
+            at = segment.hi
+            segment.hi -= 1
+        else:
+            at = segment.lo
+            segment.lo += 1
+        return (segment.line, at) if segment.vertical else (at, segment.line)
+
+    def index(self, segment):
+        return self.columns if segment.vertical else self.rows
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        for segment in self.segments:
+            cells = range(segment.hi, segment.lo - 1, -1) if segment.step < 0 else range(segment.lo, segment.hi + 1)
+            if segment.vertical:
+                for at in cells:
+                    yield segment.line, at, segment.symbol
+            else:
+                for at in cells:
+                    yield at, segment.line, segment.symbol
+
+    def __contains__(self, cell):
+        x, y = cell
+        return covers(self.rows.get(y), x) or covers(self.columns.get(x), y)
+
+def covers(runs, at):
+    # Whether one of the sorted, non-overlapping runs includes position `at`
+    if not runs:
+        return False
+    i = bisect_right(runs, at, key=segment_start)
+    return i > 0 and runs[i - 1].hi >= at
+
+class TrailOccupancy:
+    # Read-only occupancy (index y * size + x -> count) for 'segments' mode on big
+    # arenas: obstacle counts plus lookups in the trails' interval indexes
+    __slots__ = ('obstacles', 'trails', 'size')
+
+    def __init__(self, obstacles, trails, size):
+        self.obstacles = obstacles
+        self.trails = trails
+        self.size = size
+
+    def __getitem__(self, i):
+        cell = (i % self.size, i // self.size)
+        return self.obstacles[i] + sum(cell in trail for trail in self.trails)
+
+def create_grid(size):
+    return [['.' for _ in range(size)] for _ in range(size)]
+
+def create_occupancy(size):
+    # Cell counts indexed by y * size + x
+    return SparseCounts() if size > SPARSE_ARENA_SIZE else bytearray(size * size)
+
+def occupy(occupancy, x, y, size=GRID_SIZE):
+    occupancy[y * size + x] += 1
+
+def vacate(occupancy, x, y, size=GRID_SIZE):
+    occupancy[y * size + x] -= 1
+
+def is_occupied(occupancy, x, y, size=GRID_SIZE):
+    return 0 <= x < size and 0 <= y < size and occupancy[y * size + x] > 0
+
+def build_occupancy(player_trail, rinzler_trail, obstacles):
+    occupancy = create_occupancy(GRID_SIZE)
+    for cells in (player_trail, rinzler_trail, obstacles):
+        for x, y, _ in cells:
+            occupy(occupancy, x, y)
+    return occupancy
+
+# Zobrist keys: one per cell for "blocked", and one per cell for each head in a search position
+_zobrist_rng = random.Random(ZOBRIST_SEED)
+ZOBRIST_CELLS = [_zobrist_rng.getrandbits(64) for _ in range(GRID_SIZE * GRID_SIZE)]
+ZOBRIST_MOVER = [_zobrist_rng.getrandbits(64) for _ in range(GRID_SIZE * GRID_SIZE)]
+ZOBRIST_OTHER = [_zobrist_rng.getrandbits(64) for _ in range(GRID_SIZE * GRID_SIZE)]
+
+def zobrist_hash(occupancy):
+    h = 0
+    for i, count in enumerate(occupancy):
+        if count:
+            h ^= ZOBRIST_CELLS[i]
+    return h
+
+def create_zobrist(occupancy):
+    # Running hash of the blocked cells, kept up to date by update_trail
+    return {'hash': zobrist_hash(occupancy)}
+
+def place_obstacles(grid, count, occupancy=None, rng=random, size=GRID_SIZE):
+    # grid may be None for arenas too big to draw
+    obstacles = CellList()
+    for _ in range(count):
+        shape_type = rng.choice(['HORIZONTAL', 'VERTICAL', 'L_SHAPE'])
+        x, y = rng.randint(1, size - 5), rng.randint(1, size - 5)
+        
+        if shape_type == 'HORIZONTAL':
+            for i in range(3):
+                obstacles.append(x + i, y, Symbol.HORIZONTAL)
+        elif shape_type == 'VERTICAL':
+            for i in range(3):
+                obstacles.append(x, y + i, Symbol.VERTICAL)
+        elif shape_type == 'L_SHAPE':
+            for i in range(2):
+                obstacles.append(x + i, y, Symbol.HORIZONTAL)
+            for i in range(2):
+                obstacles.append(x, y + i, Symbol.VERTICAL)
+    for x, y, symbol in obstacles:
+        if grid is not None:
+            grid[y][x] = GLYPHS[symbol]
+        if occupancy is not None:
+            occupy(occupancy, x, y, size)
+    return obstacles
+
+def add_boundary_walls(grid):
+    size = len(grid)
+    for i in range(size):
+        grid[0][i] = '─'
+        grid[size - 1][i] = '─'
+        grid[i][0] = '|'
+        grid[i][size - 1] = '|'
+
+def update_trail(trail, lightcycle, trail_length, occupancy=None, zobrist=None, size=GRID_SIZE, changed=None):
+    # Expire the oldest cell first so a full Trail always has room for the new one.
+    # The Zobrist keys only cover GRID_SIZE arenas. Both cells go into the `changed`
+    # set, if given, for planners that catch up incrementally.
+    if len(trail) >= trail_length:
+        x, y = trail.popleft()
+        if changed is not None:
+            changed.add(y * size + x)
+        if occupancy is not None:
+            vacate(occupancy, x, y, size)
+            i = y * size + x
+            if zobrist is not None and occupancy[i] == 0:
+                zobrist['hash'] ^= ZOBRIST_CELLS[i]
+    trail.append(lightcycle.x, lightcycle.y, lightcycle.trail_symbol)
+    if changed is not None:
+        changed.add(lightcycle.y * size + lightcycle.x)
+    if occupancy is not None:
+        occupy(occupancy, lightcycle.x, lightcycle.y, size)
+        i = lightcycle.y * size + lightcycle.x
+        if zobrist is not None and occupancy[i] == 1:
+            zobrist['hash'] ^= ZOBRIST_CELLS[i]
+
+def in_arena(lightcycle, size=GRID_SIZE):
+    return 0 < lightcycle.x < size - 1 and 0 < lightcycle.y < size - 1
+
+def check_collision(lightcycle, trails, obstacles, occupancy=None, size=GRID_SIZE):
+    if occupancy is not None:
+        return is_occupied(occupancy, lightcycle.x, lightcycle.y, size)
+    cell = (lightcycle.x, lightcycle.y)
+    return any(cell in cells for cells in trails + [obstacles])
+
+def a_star(start, goal, player_trail, rinzler_trail, obstacles, occupancy=None, stats=None, landmarks=None):
+    # stats, if given, is a dict whose 'expanded' count goes up by the nodes popped.
+    # landmarks (from landmark_tables) tighten the Manhattan heuristic with ALT bounds.
+    if occupancy is None:
+        occupancy = build_occupancy(player_trail, rinzler_trail, obstacles)
+
+    if landmarks:
+        goal_index = goal[1] * GRID_SIZE + goal[0]
+        bounds = [(table, table[goal_index]) for table in landmarks if table[goal_index] != UNREACHABLE]
+
+        def heuristic(a, b):
+            # A cell a landmark cannot reach while it reaches the goal is cut off from
+            # the goal, so its huge bound is still safe
+            i = a[1] * GRID_SIZE + a[0]
+            h = abs(a[0] - b[0]) + abs(a[1] - b[1])
+            for table, to_goal in bounds:
+                d = to_goal - table[i]
+                if d > h:
+                    h = d
+                elif -d > h:
+                    h = -d
+            return h
+    else:
+        def heuristic(a, b):
+            return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+    def get_neighbors(node):
+        neighbors = [
+            (node[0] + 1, node[1]),
+            (node[0] - 1, node[1]),
+            (node[0], node[1] + 1),
+            (node[0], node[1] - 1)
+        ]
+        valid_neighbors = []
+        for x, y in neighbors:
+            if 0 <= x < GRID_SIZE and 0 <= y < GRID_SIZE:
+                if not occupancy[y * GRID_SIZE + x]:
+                    valid_neighbors.append((x, y))
+        return valid_neighbors
+
+    open_set = []
+    heapq.heappush(open_set, (0, start))
+    came_from = {}
+    g_score = {start: 0}
+    f_score = {start: heuristic(start, goal)}
+
+    while open_set:
+        _, current = heapq.heappop(open_set)
+        if stats is not None:
+            stats['expanded'] = stats.get('expanded', 0) + 1
+
+        if current == goal:
+            path = []
+            while current in came_from:
+                path.append(current)
+                current = came_from[current]
+            path.reverse()
+            return path
+
+        for neighbor in get_neighbors(current):
+            tentative_g_score = g_score[current] + 1
+
+            if neighbor not in g_score or tentative_g_score < g_score[neighbor]:
+                came_from[neighbor] = current
+                g_score[neighbor] = tentative_g_score
+                f_score[neighbor] = tentative_g_score + heuristic(neighbor, goal)
+                heapq.heappush(open_set, (f_score[neighbor], neighbor))
+
+    return []
+
+UNREACHABLE = 0xFFFF  # Landmark table entry for a cell the landmark cannot reach
+_landmark_cache = {}
+
+def landmark_tables(obstacles):
+    # ALT landmarks for a map: breadth-first distances from LANDMARK_COUNT cells over the
+    # board with only the obstacles blocked, the same graph a_star searches. Trails only
+    # make paths longer, so |d(L, goal) - d(L, n)| stays a lower bound on n's distance
+    # to the goal. Landmarks are picked farthest-first, starting from a corner. A map is
+    # fixed by its seed, so the tables are cached by obstacle layout.
+    key = tuple((x, y) for x, y, _ in obstacles)
+    if key in _landmark_cache:
+        return _landmark_cache[key]
+    blocked = create_occupancy(GRID_SIZE)
+    for x, y in key:
+        blocked[y * GRID_SIZE + x] = 1
+    tables = []
+    nearest = array('H', [UNREACHABLE]) * (GRID_SIZE * GRID_SIZE)
+    landmark = 0
+    for _ in range(LANDMARK_COUNT):
+        table = array('H', [UNREACHABLE]) * (GRID_SIZE * GRID_SIZE)
+        table[landmark] = 0
+        frontier = [landmark]
+        while frontier:
+            next_frontier = []
+            for i in frontier:
+                x, y = i % GRID_SIZE, i // GRID_SIZE
+                for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                    j = ny * GRID_SIZE + nx
+                    if 0 <= nx < GRID_SIZE and 0 <= ny < GRID_SIZE and not blocked[j] and table[j] == UNREACHABLE:
+                        table[j] = table[i] + 1
+                        next_frontier.append(j)
+            frontier = next_frontier
+        tables.append(table)
+        nearest = array('H', map(min, nearest, table))
+        landmark = max((i for i in range(GRID_SIZE * GRID_SIZE) if nearest[i] != UNREACHABLE), key=nearest.__getitem__)
+    if len(_landmark_cache) >= LANDMARK_CACHE_SIZE:
+        del _landmark_cache[next(iter(_landmark_cache))]
+    _landmark_cache[key] = tables
+    return tables
+
+def jump_point_search(start, goal, player_trail, rinzler_trail, obstacles, occupancy=None, stats=None):
+    # Jump Point Search for the 4-connected grid, a drop-in for a_star with paths of the
+    # same length. Straight runs are skipped instead of expanded: a horizontal jump stops
+    # at the goal or where an obstacle beside it ends (a forced neighbour); a vertical
+    # jump also stops wherever a horizontal jump from it would. Only the stopping
+    # points go on the open list, and the path is filled back in between them.
+    if occupancy is None:
+        occupancy = build_occupancy(player_trail, rinzler_trail, obstacles)
+
+    # Scans run over a copy of the board with a blocked ring around it, indexed
+    # (y + 1) * width + x + 1, so they need no bounds checks
+    width = GRID_SIZE + 2
+    blocked = bytearray(b'\x01') * (width * width)
+    for y in range(GRID_SIZE):
+        row = (y + 1) * width + 1
+        blocked[row:row + GRID_SIZE] = occupancy[y * GRID_SIZE:(y + 1) * GRID_SIZE]
+    target = (goal[1] + 1) * width + goal[0] + 1
+
+    def jump_horizontal(i, d):
+        while not blocked[i]:
+            if i == target or (not blocked[i - width] and blocked[i - d - width]) \
+                    or (not blocked[i + width] and blocked[i - d + width]):
+                return i
+            i += d
+        return None
+
+    def jump(i, d):
+        # The jump point reached by stepping into cell i along offset d, or None
+        if d in (1, -1):
+            return jump_horizontal(i, d)
+        while not blocked[i]:
+            if i == target or (not blocked[i - 1] and blocked[i - 1 - d]) or (not blocked[i + 1] and blocked[i + 1 - d]) \
+                    or jump_horizontal(i + 1, 1) is not None or jump_horizontal(i - 1, -1) is not None:
+                return i
+            i += d
+        return None
+
+    def heuristic(i):
+        return abs(i % width - target % width) + abs(i // width - target // width)
+
+    source = (start[1] + 1) * width + start[0] + 1
+    open_set = [(heuristic(source), source)]
+    came_from = {}
+    g_score = {source: 0}
+    closed = set()
+
+    while open_set:
+        _, current = heapq.heappop(open_set)
+        if current in closed:
+            continue
+        closed.add(current)
+        if stats is not None:
+            stats['expanded'] = stats.get('expanded', 0) + 1
+
+        if current == target:
+            path = []
+            while current in came_from:
+                parent = came_from[current]
+                step = 1 if current // width == parent // width else width
+                step = step if current > parent else -step
+                while current != parent:
+                    path.append((current % width - 1, current // width - 1))
+                    current -= step
+            path.reverse()
+            return path
+
+        # Pruned directions: straight on and both sides, never back towards the parent
+        if current in came_from:
+            parent = came_from[current]
+            d = 1 if current // width == parent // width else width
+            d = d if current > parent else -d
+            side = width if d in (1, -1) else 1
+            offsets = (d, side, -side)
+        else:
+            offsets = (1, -1, width, -width)
+        for d in offsets:
+            point = jump(current + d, d)
+            if point is None:
+                continue
+            distance = abs(point - current) if d in (1, -1) else abs(point - current) // width
+            tentative_g_score = g_score[current] + distance
+            if point not in g_score or tentative_g_score < g_score[point]:
+                came_from[point] = current
+                g_score[point] = tentative_g_score
+                heapq.heappush(open_set, (tentative_g_score + heuristic(point), point))
+
+    return []
+
+def flow_field(goal, occupancy, size=GRID_SIZE, targets=None):
+    # A distance map with the boundary walls blocked, for sharing between many chasers:
+    # one breadth-first pass from the goal, after which any cycle finds its way downhill
+    # with four lookups (flow_move). The goal is seeded even though it is usually a
+    # cycle's head, already on its trail. If `targets` (cell indexes) is given the
+    # search stops once they are all reached. -1 = unreachable or not searched.
+    field = [-1] * (size * size)
+    solid = bytearray(occupancy)
+    solid[:size] = solid[-size:] = b'\x01' * size
+    solid[::size] = solid[size - 1::size] = b'\x01' * size
+    wanted = bytearray(size * size)
+    left = -1
+    if targets is not None:
+        for t in targets:
+            if not solid[t] and not wanted[t]:
+                wanted[t] = 1
+        left = sum(wanted)
+    start = goal[1] * size + goal[0]
+    field[start] = 0
+    solid[start] = 1  # solid doubles as the visited set
+    frontier = [start]
+    d = 0
+    while frontier and left:
+        d += 1
+        next_frontier = []
+        for i in frontier:
+            for j in (i + 1, i - 1, i + size, i - size):
+                if not solid[j]:
+                    solid[j] = 1
+                    field[j] = d
+                    next_frontier.append(j)
+                    if wanted[j]:
+                        left -= 1
+        frontier = next_frontier
+    return field
+
+def flow_move(lightcycle, direction, field, occupancy, taken=(), size=GRID_SIZE):
+    # Step downhill on a flow_field: the open neighbour nearest the goal, preferring
+    # cells not in `taken` (already claimed this tick). Falls back to any open cell,
+    # then to going straight on.
+    best_key, best_move = None, direction
+    for move, (dx, dy) in DIRECTIONS.items():
+        x, y = lightcycle.x + dx, lightcycle.y + dy
+        if move == OPPOSITE[direction] or not (0 < x < size - 1 and 0 < y < size - 1) or occupancy[y * size + x]:
+            continue
+        d = field[y * size + x]
+        key = ((x, y) in taken, d < 0, d)
+        if best_key is None or key < best_key:
+            best_key, best_move = key, move
+    return best_move
+
+class IncrementalPlanner:
+    # LPA*/D* Lite over the reversed grid: the search is rooted at the player and
+    # queried at Rinzler's candidate cells. g/rhs survive between ticks, so each
+    # update only repairs the cells whose occupancy changed plus the old and new
+    # player cells; the player moving is just a change of which cell has rhs = 0.
+    def __init__(self):
+        size = GRID_SIZE * GRID_SIZE
+        self.neighbors = []
+        # The boundary walls are not in the occupancy, so the graph leaves them out
+        for i in range(size):
+            x, y = i % GRID_SIZE, i // GRID_SIZE
+            self.neighbors.append([ny * GRID_SIZE + nx for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1))
+                                   if 0 < nx < GRID_SIZE - 1 and 0 < ny < GRID_SIZE - 1])
+        self.g = [float('inf')] * size
+        self.rhs = [float('inf')] * size
+        self.open = []
+        self.km = 0
+        self.goal = None
+        self.start = None
+        self.blocked = bytes(size)
+        self.expanded = 0
+
+    def _h(self, i):
+        return abs(i % GRID_SIZE - self.start[0]) + abs(i // GRID_SIZE - self.start[1])
+
+    def _key(self, i):
+        m = min(self.g[i], self.rhs[i])
+        return (m + self._h(i) + self.km, m)
+
+    def _update_vertex(self, i):
+        if self.blocked[i]:
+            self.rhs[i] = float('inf')
+        elif i == self.goal:
+            self.rhs[i] = 0
+        else:
+            self.rhs[i] = min([self.g[n] for n in self.neighbors[i] if not self.blocked[n]], default=float('inf')) + 1
+        if self.g[i] != self.rhs[i]:
+            heapq.heappush(self.open, (self._key(i), i))
+
+    def _compute(self, queries):
+        g, rhs = self.g, self.rhs
+        while self.open:
+            k_old, u = self.open[0]
+            if k_old >= max(self._key(q) for q in queries) and all(g[q] == rhs[q] for q in queries):
+                break
+            heapq.heappop(self.open)
+            if g[u] == rhs[u]:
+                continue
+            k_new = self._key(u)
+            if k_old < k_new:
+                heapq.heappush(self.open, (k_new, u))
+                continue
+            self.expanded += 1
+            if g[u] > rhs[u]:
+                g[u] = rhs[u]
+            else:
+                g[u] = float('inf')
+                self._update_vertex(u)
+            for n in self.neighbors[u]:
+                self._update_vertex(n)
+
+    def update(self, goal, start, occupancy):
+        goal = goal[1] * GRID_SIZE + goal[0]
+        if self.start is not None:
+            self.km += abs(start[0] - self.start[0]) + abs(start[1] - self.start[1])
+        self.start = start
+
+        old_blocked, self.blocked = self.blocked, bytes(occupancy)
+        diff = int.from_bytes(old_blocked, 'little') ^ int.from_bytes(self.blocked, 'little')
+        while diff:
+            i = ((diff & -diff).bit_length() - 1) >> 3
+            diff &= ~(0xFF << (i * 8))
+            if bool(old_blocked[i]) != bool(self.blocked[i]):
+                self._update_vertex(i)
+                for n in self.neighbors[i]:
+                    self._update_vertex(n)
+
+        old_goal, self.goal = self.goal, goal
+        if old_goal != goal:
+            if old_goal is not None:
+                self._update_vertex(old_goal)
+            self._update_vertex(goal)
+
+    def path(self, start, goal, depth):
+        # Same contract as layers_path: up to depth steps downhill from start
+        i = start[1] * GRID_SIZE + start[0]
+        if self.blocked[i]:
+            return []
+        self._compute([i])
+        d = self.g[i]
+        if d == float('inf') or d == 0:
+            return []
+        path = []
+        while d > 0 and len(path) < depth:
+            i = min((n for n in self.neighbors[i] if not self.blocked[n]),
+                    key=lambda n: (self.g[n], abs(n % GRID_SIZE - goal[0]) + abs(n // GRID_SIZE - goal[1])))
+            d = self.g[i]
+            path.append((i % GRID_SIZE, i // GRID_SIZE))
+        return path
+
+def evaluate_future_moves(rinzler, player, player_trail, rinzler_trail, obstacles, depth=3, occupancy=None, planner=None,
+                          avoid_dead_ends=AVOID_DEAD_ENDS, plan=None):
+    # If a plan list is given, it receives the whole path to the player behind the
+    # chosen move, starting with the cell that move enters
+    if occupancy is None:
+        occupancy = build_occupancy(player_trail, rinzler_trail, obstacles)
+
+    # Candidates are tested against the walls as well as trails and obstacles, and the
+    # distance rings only grow until every open candidate cell has been reached
+    goal = (player.x, player.y)
+    blocked = blocked_mask(occupancy)
+    candidates = open_moves(rinzler, blocked)
+    if avoid_dead_ends:
+        candidates = prune_dead_ends(candidates, blocked)
+    if planner is not None:
+        planner.update(goal, (rinzler.x, rinzler.y), occupancy)
+        find_path = planner.path
+    else:
+        targets = sum(1 << (y * GRID_SIZE + x) for x, y in candidates.values())
+        free = board_masks(GRID_SIZE)[0] & ~blocked
+        layers = distance_layers(1 << (goal[1] * GRID_SIZE + goal[0]), free, targets)
+        find_path = lambda start, goal, depth: layers_path(layers, start, goal, depth)
+
+    best_move = None
+    best_score = float('inf')
+
+    for move, (x, y) in candidates.items():
+        path = find_path((x, y), goal, depth)
+        if not path:
+            continue
+
+        future_score = 0
+        for future_step in path[:depth]:
+            future_score += abs(future_step[0] - player.x) + abs(future_step[1] - player.y)
+
+        if future_score < best_score:
+            best_score = future_score
+            best_move = move
+
+    if best_move is not None and plan is not None:
+        cell = candidates[best_move]
+        plan.append(cell)
+        plan.extend(find_path(cell, goal, GRID_SIZE * GRID_SIZE))
+
+    if best_move is None and avoid_dead_ends and candidates:
+        # The player is out of reach; at least stay in the roomiest region
+        areas = reachable_areas(candidates, blocked)
+        return max(areas, key=areas.get)
+    return best_move if best_move else 'DOWN'
+
+def bounded_search(start, goal, occupancy, horizon, size=GRID_SIZE):
+    # Best score over simple paths of at most `horizon` steps from start, using the
+    # same per-step Manhattan score as evaluate_future_moves. Returns
+    # (score, first_step), or None when every path dead-ends short of the horizon.
+    # The boundary walls are not in the occupancy, so steps stay inside them.
+    best = None
+
+    def extend(node, steps, score, first, visited):
+        nonlocal best
+        if steps == horizon or node == goal:
+            if best is None or score < best[0]:
+                best = (score, first)
+            return
+        x, y = node
+        for nxt in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if nxt not in visited and 0 < nxt[0] < size - 1 and 0 < nxt[1] < size - 1 \
+                    and not occupancy[nxt[1] * size + nxt[0]]:
+                visited.add(nxt)
+                extend(nxt, steps + 1, score + abs(nxt[0] - goal[0]) + abs(nxt[1] - goal[1]), first or nxt, visited)
+                visited.discard(nxt)
+
+    extend(start, 0, 0, None, {start})
+    return best
+
+def follow_plan(rinzler, player, occupancy, ai):
+    # The next move along ai['plan'] if the plan still holds, otherwise None. It holds
+    # while Rinzler is on it, the next cell is free and inside the walls, no other cell
+    # outside the tolerance region around the plan's goal is blocked, and the player is
+    # still inside that region. Close to the goal Rinzler always replans.
+    plan = ai['plan']
+    if plan and plan[0] == (rinzler.x, rinzler.y):
+        plan.popleft()
+    if len(plan) < PLAN_MIN_LENGTH:
+        return None
+    x, y = plan[0]
+    move = next((move for move, (dx, dy) in DIRECTIONS.items() if (rinzler.x + dx, rinzler.y + dy) == (x, y)), None)
+    if move is None or not (0 < x < GRID_SIZE - 1 and 0 < y < GRID_SIZE - 1) or occupancy[y * GRID_SIZE + x]:
+        return None
+    gx, gy = ai['plan_goal']
+    tolerance = PLAN_TOLERANCE + int(len(plan) * PLAN_TOLERANCE_SHARE)
+    if abs(player.x - gx) + abs(player.y - gy) > tolerance:
+        return None
+    # The player's own trail covers the end of the path, so only cells outside the goal
+    # region count. The walls are not in the occupancy, hence the blocked mask.
+    blocked = blocked_mask(occupancy)
+    if any(blocked >> (y * GRID_SIZE + x) & 1 for x, y in plan if abs(x - gx) + abs(y - gy) > tolerance):
+        return None
+    return move
+
+def evaluate_bounded_moves(rinzler, player, occupancy, depth=3):
+    # Bounded-horizon scoring; None means the result is ambiguous (the best move
+    # has to detour around something) and a full-length search is needed.
+    goal = (player.x, player.y)
+    best_move = None
+    best_score = float('inf')
+    best_ideal = None
+
+    for move, (dx, dy) in DIRECTIONS.items():
+        start = (rinzler.x + dx, rinzler.y + dy)
+        if not (0 < start[0] < GRID_SIZE - 1 and 0 < start[1] < GRID_SIZE - 1) \
+                or is_occupied(occupancy, start[0], start[1]) or start == goal:
+            continue
+
+        result = bounded_search(start, goal, occupancy, depth)
+        if result is None:
+            continue
+
+        if result[0] < best_score:
+            best_score = result[0]
+            best_move = move
+            distance = abs(start[0] - goal[0]) + abs(start[1] - goal[1])
+            best_ideal = sum(max(distance - step, 0) for step in range(1, depth + 1))
+
+    if best_move is None or best_score != best_ideal:
+        return None
+    return best_move
+
+def pocket_area(start, occupancy, size, limit):
+    # Open cells reachable from start inside the walls, counting no further than limit
+    seen = {start}
+    frontier = [start]
+    while frontier and len(seen) < limit:
+        x, y = frontier.pop()
+        for nxt in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if nxt not in seen and 0 < nxt[0] < size - 1 and 0 < nxt[1] < size - 1 \
+                    and not occupancy[nxt[1] * size + nxt[0]]:
+                seen.add(nxt)
+                frontier.append(nxt)
+    return min(len(seen), limit)
+
+def local_candidates(rinzler, occupancy, size, avoid_dead_ends=AVOID_DEAD_ENDS):
+    # {move: (x, y)} for Rinzler's open neighbours, keeping only the roomiest ones (by a
+    # flood fill capped at DEAD_END_AREA cells) when avoiding dead ends
+    candidates = {}
+    for move, (dx, dy) in DIRECTIONS.items():
+        x, y = rinzler.x + dx, rinzler.y + dy
+        if 0 < x < size - 1 and 0 < y < size - 1 and not occupancy[y * size + x]:
+            candidates[move] = (x, y)
+    if avoid_dead_ends and candidates:
+        areas = {move: pocket_area(cell, occupancy, size, DEAD_END_AREA) for move, cell in candidates.items()}
+        biggest = max(areas.values())
+        candidates = {move: cell for move, cell in candidates.items() if areas[move] == biggest}
+    return candidates
+
+def evaluate_local_moves(rinzler, player, occupancy, size, depth=3, avoid_dead_ends=AVOID_DEAD_ENDS):
+    # Chase for arenas other than GRID_SIZE: the bounded lookahead plus a flood fill
+    # capped at DEAD_END_AREA cells, so a tick costs the same however big the arena is
+    goal = (player.x, player.y)
+    candidates = local_candidates(rinzler, occupancy, size, avoid_dead_ends)
+
+    best_move = None
+    best_score = float('inf')
+    for move, start in candidates.items():
+        if start == goal:
+            continue
+        result = bounded_search(start, goal, occupancy, depth, size)
+        if result is not None and result[0] < best_score:
+            best_score = result[0]
+            best_move = move
+    if best_move is None and candidates:
+        return next(iter(candidates))
+    return best_move if best_move else 'DOWN'
+
+class HierarchicalPlanner:
+    # HPA* for big arenas. The arena is cut into `cluster` x `cluster` blocks. Every
+    # run of cells open on both sides of a block border gets one crossing (the pair of
+    # cells in its middle), and each block keeps a table of walking distances between
+    # its crossing cells. Crossings are scanned once up front; a block's table is built
+    # the first time a search passes through it. invalidate() re-scans only the borders
+    # a changed cell lies on and drops the tables of the blocks it touches, so a trail
+    # entering a cluster costs that cluster (and on a border, its neighbour) a rebuild.
+    def __init__(self, occupancy, size, cluster=HPA_CLUSTER_SIZE):
+        self.occupancy = occupancy
+        self.size = size
+        self.cluster = cluster
+        self.clusters = -(-size // cluster)
+        self.crossings = {}  # (cx, cy, 'RIGHT' or 'DOWN') -> [(a, b)], a on the block's side
+        self.links = {}  # Crossing cell -> cells across its border
+        self.tables = {}  # (cx, cy) -> {crossing cell: [(crossing cell, distance)]}
+        self.expanded = 0
+        self.rebuilt = 0
+        for cy in range(self.clusters):
+            for cx in range(self.clusters):
+                self.scan((cx, cy, 'RIGHT'))
+                self.scan((cx, cy, 'DOWN'))
+
+    def is_free(self, i):
+        size = self.size
+        return 0 < i % size < size - 1 and 0 < i // size < size - 1 and not self.occupancy[i]
+
+    def cluster_of(self, i):
+        return i % self.size // self.cluster, i // self.size // self.cluster
+
+    def scan(self, border):
+        # Find the crossings of one block border
+        cx, cy, side = border
+        size, cluster = self.size, self.cluster
+        for a, b in self.crossings.pop(border, ()):
+            self.links[a].discard(b)
+            self.links[b].discard(a)
+        if side == 'RIGHT':
+            x = (cx + 1) * cluster - 1
+            if x + 1 >= size:
+                return
+            pairs = [(y * size + x, y * size + x + 1) for y in range(cy * cluster, min((cy + 1) * cluster, size))]
+        else:
+            y = (cy + 1) * cluster - 1
+            if y + 1 >= size:
+                return
+            pairs = [(y * size + x, (y + 1) * size + x) for x in range(cx * cluster, min((cx + 1) * cluster, size))]
+        crossings = []
+        run = []
+        for a, b in pairs + [(None, None)]:
+            if a is not None and self.is_free(a) and self.is_free(b):
+                run.append((a, b))
+            elif run:
+                crossings.append(run[len(run) // 2])
+                run = []
+        self.crossings[border] = crossings
+        for a, b in crossings:
+            self.links.setdefault(a, set()).add(b)
+            self.links.setdefault(b, set()).add(a)
+
+    def entrances(self, cx, cy):
+        # Crossing cells inside block (cx, cy)
+        cells = [a for a, _ in self.crossings.get((cx, cy, 'RIGHT'), ())]
+        cells += [a for a, _ in self.crossings.get((cx, cy, 'DOWN'), ())]
+        cells += [b for _, b in self.crossings.get((cx - 1, cy, 'RIGHT'), ())]
+        cells += [b for _, b in self.crossings.get((cx, cy - 1, 'DOWN'), ())]
+        return cells
+
+    def flood(self, start, cx, cy):
+        # Walking distance from start to every open cell of block (cx, cy), staying inside it
+        size, cluster = self.size, self.cluster
+        x0, y0 = cx * cluster, cy * cluster
+        x1, y1 = min(x0 + cluster, size), min(y0 + cluster, size)
+        distances = {start: 0}
+        frontier = [start]
+        while frontier:
+            next_frontier = []
+            for i in frontier:
+                d = distances[i] + 1
+                x, y = i % size, i // size
+                for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                    j = ny * size + nx
+                    if x0 <= nx < x1 and y0 <= ny < y1 and j not in distances and self.is_free(j):
+                        distances[j] = d
+                        next_frontier.append(j)
+            frontier = next_frontier
+        return distances
+
+    def table(self, cx, cy):
+        if (cx, cy) not in self.tables:
+            cells = set(self.entrances(cx, cy))
+            table = {}
+            for cell in cells:
+                distances = self.flood(cell, cx, cy)
+                table[cell] = [(other, distances[other]) for other in cells if other != cell and other in distances]
+            self.tables[cx, cy] = table
+            self.rebuilt += 1
+        return self.tables[cx, cy]
+
+    def invalidate(self, i):
+        # Cell i has been blocked or freed
+        cx, cy = self.cluster_of(i)
+        x, y = i % self.size % self.cluster, i // self.size % self.cluster
+        self.tables.pop((cx, cy), None)
+        for edge, border, other in ((x == 0, (cx - 1, cy, 'RIGHT'), (cx - 1, cy)),
+                                    (x == self.cluster - 1, (cx, cy, 'RIGHT'), (cx + 1, cy)),
+                                    (y == 0, (cx, cy - 1, 'DOWN'), (cx, cy - 1)),
+                                    (y == self.cluster - 1, (cx, cy, 'DOWN'), (cx, cy + 1))):
+            if edge and 0 <= other[0] < self.clusters and 0 <= other[1] < self.clusters:
+                self.scan(border)
+                self.tables.pop(other, None)
+
+    def update(self, changed):
+        # Catch up with the cells changed since the last search, then forget them
+        for i in changed:
+            self.invalidate(i)
+        changed.clear()
+
+    def distances(self, goal, targets, deadline=None):
+        # {key: walking distance from cell `goal`} for a {key: cell} dict, inf when out
+        # of reach. An A* search from the goal over the crossings; it stops once the
+        # nearest targets are settled, so only those distances are exact. Past the
+        # deadline it gives up with what it has; the tables it built are kept.
+        size = self.size
+        best = {key: math.inf for key in targets}
+        if not targets or not self.is_free(goal):
+            return best
+        floods = {key: self.flood(cell, *self.cluster_of(cell)) for key, cell in targets.items()}
+        cells = [(cell % size, cell // size) for cell in targets.values()]
+
+        def heuristic(i):
+            x, y = i % size, i // size
+            return min(abs(x - tx) + abs(y - ty) for tx, ty in cells)
+
+        start = self.flood(goal, *self.cluster_of(goal))
+        cost = {goal: 0}
+        open_list = [(heuristic(goal), 0, goal)]
+        while open_list:
+            f, d, i = heapq.heappop(open_list)
+            if d > cost[i]:
+                continue
+            if f > min(best.values()):
+                break
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+            self.expanded += 1
+            for key, flood in floods.items():
+                if i in flood and d + flood[i] < best[key]:
+                    best[key] = d + flood[i]
+            if i == goal:
+                edges = [(cell, start[cell]) for cell in self.entrances(*self.cluster_of(goal)) if cell in start]
+            else:
+                edges = self.table(*self.cluster_of(i)).get(i, []) + [(j, 1) for j in self.links.get(i, ())]
+            for j, w in edges:
+                if d + w < cost.get(j, math.inf):
+                    cost[j] = d + w
+                    heapq.heappush(open_list, (d + w + heuristic(j), d + w, j))
+        return best
+
+def evaluate_hpa_moves(rinzler, player, occupancy, planner, size, avoid_dead_ends=AVOID_DEAD_ENDS, deadline=None):
+    # Chase on big arenas: step towards the candidate with the shortest HPA* distance to
+    # the player, nearest by Manhattan distance on ties. Falls back to the local chase
+    # when no candidate reaches the player before the deadline.
+    goal = (player.x, player.y)
+    candidates = {move: cell for move, cell in local_candidates(rinzler, occupancy, size, avoid_dead_ends).items()
+                  if cell != goal}
+    distances = planner.distances(goal[1] * size + goal[0], {move: y * size + x for move, (x, y) in candidates.items()},
+                                  deadline)
+    reachable = {move: d for move, d in distances.items() if d < math.inf}
+    if not reachable:
+        return evaluate_local_moves(rinzler, player, occupancy, size, avoid_dead_ends=avoid_dead_ends)
+    return min(reachable, key=lambda move: (reachable[move],
+                                            abs(candidates[move][0] - goal[0]) + abs(candidates[move][1] - goal[1])))
+
+# Bit b of a board mask is cell (b % size, b // size); 1 = cell is in the set
+OCCUPANCY_BITS = bytes([ord('0')] + [ord('1')] * 255)
+_board_masks = {}
+
+def board_masks(size):
+    # (all cells, left column, right column, boundary ring) for a size x size board
+    if size not in _board_masks:
+        full = (1 << size * size) - 1
+        left = sum(1 << (y * size) for y in range(size))
+        right = left << (size - 1)
+        top = (1 << size) - 1
+        border = left | right | top | (top << (size * (size - 1)))
+        _board_masks[size] = (full, left, right, border)
+    return _board_masks[size]
+
+def occupancy_mask(occupancy, size=GRID_SIZE):
+    # Pack the occupancy counts into one bit per cell. Big arenas' SparseCounts and
+    # TrailOccupancy views only visit their solid cells.
+    if isinstance(occupancy, TrailOccupancy):
+        return occupancy_mask(occupancy.obstacles, occupancy.size) | cells_mask(chain(*occupancy.trails), occupancy.size)
+    if isinstance(occupancy, SparseCounts):
+        bits = bytearray((size * size + 7) // 8)
+        for i in occupancy:
+            bits[i >> 3] |= 1 << (i & 7)
+        return int.from_bytes(bits, 'little')
+    return int(occupancy.translate(OCCUPANCY_BITS)[::-1], 2)
+
+def blocked_mask(occupancy, size=GRID_SIZE):
+    # Trails and obstacles from the occupancy grid plus the boundary walls
+    return occupancy_mask(occupancy, size) | board_masks(size)[3]
+
+def cells_mask(cells, size=GRID_SIZE):
+    # Bitboard of a CellList, Trail or any iterable of (x, y, symbol); the bits are set
+    # in a byte buffer, since OR-ing into a big int copies it for every cell
+    bits = bytearray((size * size + 7) // 8)
+    for x, y, _ in cells:
+        i = y * size + x
+        bits[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(bits, 'little')
+
+def spread(front, size, masks):
+    full, left, right, _ = masks
+    return ((front & ~right) << 1) | ((front & ~left) >> 1) | ((front << size) & full) | (front >> size)
+
+def area(mask):
+    return mask.bit_count()
+
+def flood_fill(seed, free, size=GRID_SIZE):
+    # The cells of free connected to the seed bits
+    masks = board_masks(size)
+    region = front = seed & free
+    while front:
+        front = spread(front, size, masks) & free & ~region
+        region |= front
+    return region
+
+def distance_layers(goal, free, targets, size=GRID_SIZE):
+    # Breadth-first rings out from the goal bit over free: layers[d] holds the cells at
+    # distance d. Stops as soon as every target bit has been reached.
+    if not goal & free:
+        return []
+    masks = board_masks(size)
+    layers = [goal]
+    seen = goal
+    while targets & ~seen:
+        front = spread(layers[-1], size, masks) & free & ~seen
+        if not front:
+            break
+        seen |= front
+        layers.append(front)
+    return layers
+
+def open_moves(lightcycle, blocked, size=GRID_SIZE):
+    # {move: (x, y)} for each neighbouring cell that is not blocked
+    moves = {}
+    for move, (dx, dy) in DIRECTIONS.items():
+        x, y = lightcycle.x + dx, lightcycle.y + dy
+        if 0 <= x < size and 0 <= y < size and not blocked >> (y * size + x) & 1:
+            moves[move] = (x, y)
+    return moves
+
+def reachable_areas(cells, blocked, size=GRID_SIZE):
+    # {key: size of the open region around cell} for a {key: (x, y)} dict; cells in
+    # the same region share one flood fill
+    free = board_masks(size)[0] & ~blocked
+    regions = []
+    areas = {}
+    for key, (x, y) in cells.items():
+        bit = 1 << (y * size + x)
+        region = next((region for region in regions if region & bit), None)
+        if region is None:
+            region = flood_fill(bit, free, size)
+            regions.append(region)
+        areas[key] = area(region)
+    return areas
+
+def prune_dead_ends(candidates, blocked, min_area=DEAD_END_AREA, size=GRID_SIZE):
+    # Drop candidate cells whose open region has fewer than min_area cells. If they all
+    # do, keep the ones with the biggest region.
+    areas = reachable_areas(candidates, blocked, size)
+    roomy = {move: cell for move, cell in candidates.items() if areas[move] >= min_area}
+    if roomy or not candidates:
+        return roomy
+    biggest = max(areas.values())
+    return {move: cell for move, cell in candidates.items() if areas[move] == biggest}
+
+def layers_path(layers, start, goal, depth, size=GRID_SIZE):
+    # Walk distance_layers downhill from start for up to depth steps
+    x, y = start
+    d = next((d for d, layer in enumerate(layers) if layer >> (y * size + x) & 1), -1)
+    if d <= 0:
+        return []
+    path = []
+    while d > 0 and len(path) < depth:
+        below = layers[d - 1]
+        steps = [(nx, ny) for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1))
+                 if 0 <= nx < size and 0 <= ny < size and below >> (ny * size + nx) & 1]
+        x, y = min(steps, key=lambda s: abs(s[0] - goal[0]) + abs(s[1] - goal[1]))
+        path.append((x, y))
+        d -= 1
+    return path
+
+def territory(blocked, a, b, size=GRID_SIZE):
+    # Grow both BFS fronts one ring per step over the whole board at once; cells
+    # reached by both on the same step are neutral. Returns (cells a owns, cells b owns).
+    masks = board_masks(size)
+    free = masks[0] & ~blocked
+    front_a, front_b = 1 << a, 1 << b
+    seen = front_a | front_b
+    owned_a = owned_b = 0
+    while front_a or front_b:
+        next_a = spread(front_a, size, masks) & free & ~seen
+        next_b = spread(front_b, size, masks) & free & ~seen
+        seen |= next_a | next_b
+        front_a, front_b = next_a & ~next_b, next_b & ~next_a
+        owned_a += front_a.bit_count()
+        owned_b += front_b.bit_count()
+    return owned_a, owned_b
+
+def evaluate_territory_moves(rinzler, player, occupancy, size=GRID_SIZE):
+    blocked = blocked_mask(occupancy, size)
+    goal = player.y * size + player.x
+
+    best_move = None
+    best_score = None
+
+    for move, (dx, dy) in DIRECTIONS.items():
+        x, y = rinzler.x + dx, rinzler.y + dy
+        cell = y * size + x
+        if not (0 <= x < size and 0 <= y < size) or blocked >> cell & 1 or cell == goal:
+            continue
+
+        mine, theirs = territory(blocked, cell, goal, size)
+        # Prefer the bigger territory lead, then the move that stays closer to the player
+        score = (mine - theirs, -(abs(x - player.x) + abs(y - player.y)))
+        if best_score is None or score > best_score:
+            best_score = score
+            best_move = move
+
+    return best_move if best_move else 'DOWN'
+
+class SearchTimeout(Exception):
+    pass
+
+TT_EXACT, TT_LOWER, TT_UPPER = 0, 1, 2
+
+class TranspositionTable:
+    # Fixed number of slots indexed by the low bits of the key. A slot is replaced
+    # when it is empty, left over from an earlier tick's search, or holds a
+    # shallower result than the new one.
+    def __init__(self, size=TT_SIZE):
+        self.mask = size - 1
+        self.slots = [None] * size
+        self.generation = 0
+        self.probes = self.hits = self.cutoffs = self.stores = self.replacements = 0
+
+    def new_search(self):
+        self.generation += 1
+
+    def probe(self, key):
+        self.probes += 1
+        entry = self.slots[key & self.mask]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        return None
+
+    def store(self, key, depth, score, flag, best):
+        i = key & self.mask
+        entry = self.slots[i]
+        if entry is None or entry[5] != self.generation or depth >= entry[1]:
+            if entry is not None and entry[0] != key:
+                self.replacements += 1
+            self.slots[i] = (key, depth, score, flag, best, self.generation)
+            self.stores += 1
+
+    def hit_rate(self):
+        return self.hits / self.probes if self.probes else 0.0
+
+def negamax(blocked, key, me, opp, depth, alpha, beta, search):
+    # `me` is the cycle to move; both heads are already set in `blocked`, and
+    # `key` is the Zobrist hash of that position
+    if time.perf_counter() > search['deadline'] or search['stop'].is_set():
+        raise SearchTimeout
+    search['nodes'] += 1
+    table = search['table']
+    hint = None
+    if table is not None:
+        entry = table.probe(key)
+        if entry is not None:
+            _, entry_depth, score, flag, hint, _ = entry
+            if entry_depth >= depth and (flag == TT_EXACT or (flag == TT_LOWER and score >= beta) or (flag == TT_UPPER and score <= alpha)):
+                table.cutoffs += 1
+                return score
+
+    moves = [n for n in (me - GRID_SIZE, me + GRID_SIZE, me - 1, me + 1) if not blocked >> n & 1]
+    if not moves:
+        best = -WIN_SCORE - depth  # Crashing sooner is worse
+    elif depth == 0:
+        mine, theirs = territory(blocked, me, opp)
+        best = mine - theirs
+    else:
+        if hint in moves:
+            moves.remove(hint)
+            moves.insert(0, hint)
+        alpha_orig = alpha
+        best = -float('inf')
+        heads = key ^ ZOBRIST_MOVER[me] ^ ZOBRIST_OTHER[opp] ^ ZOBRIST_MOVER[opp]
+        for n in moves:
+            score = -negamax(blocked | 1 << n, heads ^ ZOBRIST_CELLS[n] ^ ZOBRIST_OTHER[n], opp, n, depth - 1, -beta, -alpha, search)
+            if score > best:
+                best = score
+                hint = n
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        if table is not None:
+            flag = TT_UPPER if best <= alpha_orig else TT_LOWER if best >= beta else TT_EXACT
+            table.store(key, depth, best, flag, hint)
+        return best
+
+    if table is not None:
+        table.store(key, depth, best, TT_EXACT, None)
+    return best
+
+def search_best_move(rinzler, player, occupancy, ai):
+    # Iterative-deepening alpha-beta: Rinzler and the player move alternately and
+    # the move from the deepest fully searched iteration is kept when time runs out.
+    deadline = time.perf_counter() + ai['budget']
+    me = rinzler.y * GRID_SIZE + rinzler.x
+    opp = player.y * GRID_SIZE + player.x
+    blocked = blocked_mask(occupancy) | 1 << me | 1 << opp
+    order = [move for move, step in STEPS.items() if not blocked >> me + step & 1]
+    if not order:
+        return 'DOWN'
+
+    key = ai['zobrist']['hash'] if ai.get('zobrist') is not None else zobrist_hash(occupancy)
+    for head in (me, opp):
+        if not occupancy[head]:
+            key ^= ZOBRIST_CELLS[head]
+    table = ai.get('table')
+    if table is not None:
+        table.new_search()
+    search = {'deadline': deadline, 'nodes': 0, 'table': table, 'stop': ai['stop']}
+    best_move = order[0]
+    ai['search_depth'] = 0
+    try:
+        for depth in range(1, SEARCH_MAX_DEPTH + 1):
+            alpha, beta = -float('inf'), float('inf')
+            scores = {}
+            for move in order:
+                n = me + STEPS[move]
+                child = key ^ ZOBRIST_CELLS[n] ^ ZOBRIST_MOVER[opp] ^ ZOBRIST_OTHER[n]
+                scores[move] = -negamax(blocked | 1 << n, child, opp, n, depth - 1, -beta, -alpha, search)
+                alpha = max(alpha, scores[move])
+            # Search the best move first on the next iteration so cutoffs come early
+            order.sort(key=lambda move: -scores[move])
+            best_move = order[0]
+            ai['search_depth'] = depth
+            if abs(scores[best_move]) >= WIN_SCORE:
+                break
+    except SearchTimeout:
+        pass
+    ai['nodes'] = search['nodes']
+    return best_move
+
+def rollout(blocked, me, opp, rng):
+    # Play safe random moves until someone is boxed in; returns 1.0 if `me` (to move) wins
+    mover_is_me = True
+    for _ in range(ROLLOUT_MAX_STEPS):
+        moves = [n for n in (me - GRID_SIZE, me + GRID_SIZE, me - 1, me + 1) if not blocked >> n & 1]
+        if not moves:
+            return 0.0 if mover_is_me else 1.0
+        n = rng.choice(moves)
+        blocked |= 1 << n
+        me, opp = opp, n
+        mover_is_me = not mover_is_me
+    mine, theirs = territory(blocked, me, opp)
+    if mine == theirs:
+        return 0.5
+    return float((mine > theirs) == mover_is_me)
+
+_search_generation = None  # The pool's shared search counter, set in each worker process by init_pool_worker
+
+def init_pool_worker(generation):
+    global _search_generation
+    _search_generation = generation
+
+def ai_pool(ai):
+    # The AI's process pool, started on first use. ai['generation'] is shared with the
+    # workers; bumping it tells every search still running for an older frame to stop.
+    if ai.get('pool') is None:
+        ai['generation'] = multiprocessing.RawValue('i', 0)
+        ai['pool'] = concurrent.futures.ProcessPoolExecutor(max_workers=MCTS_WORKERS, initializer=init_pool_worker,
+                                                            initargs=(ai['generation'],))
+    return ai['pool']
+
+def mcts_worker(blocked, me, opp, deadline, seed, generation=None):
+    # One independent UCT tree grown until `deadline` (a time.time() value, so it means
+    # the same in every process) or until the pool's search generation moves past
+    # `generation`. Returns the root children's stats and the rollout count.
+    rng = random.Random(seed)
+    root = {'visits': 0, 'wins': 0.0, 'children': {}, 'untried': None}
+    rollouts = 0
+    while time.time() < deadline:
+        if generation is not None and _search_generation is not None and _search_generation.value != generation:
+            break
+        node, b, m, o = root, blocked, me, opp
+        path = [root]
+        # Selection: descend through fully expanded nodes by UCT
+        while node['untried'] == [] and node['children']:
+            log_visits = math.log(node['visits'])
+            n, node = max(node['children'].items(), key=lambda item: item[1]['wins'] / item[1]['visits']
+                          + MCTS_EXPLORATION * math.sqrt(log_visits / item[1]['visits']))
+            b |= 1 << n
+            m, o = o, n
+            path.append(node)
+        # Expansion
+        if node['untried'] is None:
+            node['untried'] = [n for n in (m - GRID_SIZE, m + GRID_SIZE, m - 1, m + 1) if not b >> n & 1]
+            rng.shuffle(node['untried'])
+        if node['untried']:
+            n = node['untried'].pop()
+            child = {'visits': 0, 'wins': 0.0, 'children': {}, 'untried': None}
+            node['children'][n] = child
+            b |= 1 << n
+            m, o = o, n
+            node = child
+            path.append(child)
+        # Simulation, then backpropagation: each node holds the wins of the cycle that moved into it
+        reward = 1.0 - rollout(b, m, o, rng)
+        for node in reversed(path):
+            node['visits'] += 1
+            node['wins'] += reward
+            reward = 1.0 - reward
+        rollouts += 1
+    return {n: (child['visits'], child['wins']) for n, child in root['children'].items()}, rollouts
+
+def mcts_best_move(rinzler, player, occupancy, ai):
+    # Root-parallel MCTS: every worker grows its own tree for this frame's budget and
+    # the root statistics are merged afterwards; the most visited move wins.
+    start = time.perf_counter()
+    me = rinzler.y * GRID_SIZE + rinzler.x
+    opp = player.y * GRID_SIZE + player.x
+    blocked = blocked_mask(occupancy) | 1 << me | 1 << opp
+    if all(blocked >> me + step & 1 for step in STEPS.values()):
+        return 'DOWN'
+
+    pool = ai_pool(ai)
+    # Leave part of the budget for process round trips
+    worker_deadline = time.time() + ai['budget'] * MCTS_WORKER_SHARE
+    generation = ai['generation'].value
+    futures = [pool.submit(mcts_worker, blocked, me, opp, worker_deadline, random.getrandbits(32), generation)
+               for _ in range(MCTS_WORKERS)]
+    done = set()
+    deadline = start + ai['budget']
+    while len(done) < len(futures) and not ai['stop'].is_set() and time.perf_counter() < deadline:
+        done, _ = concurrent.futures.wait(futures, timeout=min(MCTS_POLL_INTERVAL, max(deadline - time.perf_counter(), 0)))
+    # Free the pool for the next search: queued trees never start and running ones
+    # stop at their next rollout (a Ponderer stop or a missed deadline leaves some)
+    for future in futures:
+        if future not in done:
+            future.cancel()
+    ai['generation'].value = generation + 1
+
+    visits = {move: 0 for move in STEPS}
+    wins = {move: 0.0 for move in STEPS}
+    rollouts = 0
+    for future in done:
+        stats, count = future.result()
+        rollouts += count
+        for move, step in STEPS.items():
+            if me + step in stats:
+                visits[move] += stats[me + step][0]
+                wins[move] += stats[me + step][1]
+
+    ai['visits'] = visits
+    ai['rollouts'] = rollouts
+    ai['rollouts_per_sec'] = rollouts / (time.perf_counter() - start)
+    legal = [move for move, step in STEPS.items() if not blocked >> me + step & 1]
+    return max(legal, key=lambda move: (visits[move], wins[move]))
+
+def chase_worker(blocked, start, goal, depth):
+    # Score one chase candidate on a bitboard: the size of its open region and, if the
+    # goal is reachable, the evaluate_future_moves score plus the whole path to the goal
+    free = board_masks(GRID_SIZE)[0] & ~blocked
+    bit = 1 << start
+    region = area(flood_fill(bit, free))
+    layers = distance_layers(1 << goal, free, bit)
+    x, y = start % GRID_SIZE, start // GRID_SIZE
+    gx, gy = goal % GRID_SIZE, goal // GRID_SIZE
+    path = layers_path(layers, (x, y), (gx, gy), GRID_SIZE * GRID_SIZE)
+    if not path:
+        return region, None, []
+    score = sum(abs(px - gx) + abs(py - gy) for px, py in path[:depth])
+    return region, score, path
+
+def parallel_chase_moves(rinzler, player, occupancy, ai, depth=3, plan=None):
+    # evaluate_future_moves with each candidate scored by chase_worker on the AI's
+    # process pool. Workers get the blocked bitboard and flat cell indexes. Candidates
+    # whose result misses the frame budget are left out of the choice.
+    start = time.perf_counter()
+    blocked = blocked_mask(occupancy)
+    candidates = open_moves(rinzler, blocked)
+    if not candidates:
+        return 'DOWN'
+    pool = ai_pool(ai)
+    goal = player.y * GRID_SIZE + player.x
+    futures = {pool.submit(chase_worker, blocked, y * GRID_SIZE + x, goal, depth): move
+               for move, (x, y) in candidates.items()}
+    done = set()
+    deadline = start + ai['budget']
+    while len(done) < len(futures) and not ai['stop'].is_set() and time.perf_counter() < deadline:
+        done, _ = concurrent.futures.wait(futures, timeout=min(MCTS_POLL_INTERVAL, max(deadline - time.perf_counter(), 0)))
+    for future in futures:
+        if future not in done:
+            future.cancel()
+    if not done:
+        ai['late'] += 1
+        return next(iter(candidates))
+
+    results = {futures[future]: future.result() for future in done}
+    scored = {move: results[move] for move in candidates if move in results}  # candidate order breaks ties
+    if ai['dead_ends']:
+        roomy = {move: result for move, result in scored.items() if result[0] >= DEAD_END_AREA}
+        if not roomy:
+            biggest = max(result[0] for result in scored.values())
+            roomy = {move: result for move, result in scored.items() if result[0] == biggest}
+        scored = roomy
+    reachable = [move for move, result in scored.items() if result[1] is not None]
+    if not reachable:
+        if not ai['dead_ends']:
+            return 'DOWN'
+        # The player is out of reach; at least stay in the roomiest region
+        return max(scored, key=lambda move: scored[move][0])
+    best_move = min(reachable, key=lambda move: scored[move][1])
+    if plan is not None:
+        plan.append(candidates[best_move])
+        plan.extend(scored[best_move][2])
+    return best_move
+
+def shutdown_ai(ai):
+    if ai.get('pool') is not None:
+        ai['pool'].shutdown(cancel_futures=True)
+        ai['pool'] = None
+
+def create_ai(strategy=None, planner=None, bounded=None, zobrist=None, dead_ends=None, reuse=None, parallel=None):
+    # Per-game AI settings and search state for move_rinzler
+    strategy = RINZLER_STRATEGY if strategy is None else strategy
+    planner = RINZLER_PLANNER if planner is None else planner
+    return {
+        'strategy': strategy,
+        'planner': IncrementalPlanner() if planner == 'incremental' else None,
+        'hpa': None,  # HierarchicalPlanner, made by move_rinzler on big arenas
+        'changed': None,  # Cells step() has changed since the HierarchicalPlanner last looked
+        'bounded': BOUNDED_LOOKAHEAD if bounded is None else bounded,
+        'dead_ends': AVOID_DEAD_ENDS if dead_ends is None else dead_ends,
+        'reuse': PLAN_REUSE if reuse is None else reuse,
+        'plan': deque(),  # Chase path being followed, next cell first
+        'plan_goal': None,  # Where the player was when the plan was made
+        'replans': 0,  # Chase searches run while reusing plans...
+        'reused': 0,  # ...and ticks that just followed the plan
+        'parallel': PARALLEL_CHASE if parallel is None else parallel,
+        'late': 0,  # Parallel chase decisions where no candidate was scored in time
+        'budget': MAX_SPEED * SEARCH_TIME_FRACTION,
+        'search_depth': 0,
+        'nodes': 0,
+        'zobrist': zobrist,
+        'table': TranspositionTable() if strategy == 'alphabeta' else None,
+        'pool': None,
+        'generation': None,  # Search counter shared with the pool's workers (ai_pool)
+        'visits': {},
+        'rollouts': 0,
+        'rollouts_per_sec': 0.0,
+        'stop': threading.Event(),
+    }
+
+def move_rinzler(rinzler, player, player_trail, rinzler_trail, obstacles, occupancy=None, ai=None, size=GRID_SIZE):
+    if ai is None:
+        ai = create_ai()
+    if occupancy is None:
+        occupancy = build_occupancy(player_trail, rinzler_trail, obstacles)
+    if not (0 <= player.x < size and 0 <= player.y < size):
+        return 'DOWN'  # The player has left the grid; no path can reach them
+    if size != GRID_SIZE:
+        # The planners, searches and Zobrist keys are built for GRID_SIZE; territory
+        # works on any bitboard and the chase falls back to local or HPA* planning
+        if ai['strategy'] == 'territory':
+            return evaluate_territory_moves(rinzler, player, occupancy, size)
+        if ai['strategy'] in ('alphabeta', 'mcts'):
+            raise ValueError(f"the {ai['strategy']} strategy needs a {GRID_SIZE}x{GRID_SIZE} arena")
+        if ai['planner'] is not None or ai['parallel']:
+            raise ValueError(f"the incremental planner and parallel chase need a {GRID_SIZE}x{GRID_SIZE} arena")
+        if size < HPA_ARENA_SIZE:
+            return evaluate_local_moves(rinzler, player, occupancy, size, avoid_dead_ends=ai['dead_ends'])
+        if ai['hpa'] is None or ai['hpa'].size != size or ai['hpa'].occupancy is not occupancy:
+            ai['hpa'] = HierarchicalPlanner(occupancy, size)
+            ai['changed'] = set()
+        deadline = time.perf_counter() + ai['budget']
+        ai['hpa'].update(ai['changed'])
+        return evaluate_hpa_moves(rinzler, player, occupancy, ai['hpa'], size, ai['dead_ends'], deadline)
+    if not in_arena(player):
+        # The player is crashing into a wall this tick, so there is nothing to search for
+        return evaluate_future_moves(rinzler, player, player_trail, rinzler_trail, obstacles, occupancy=occupancy,
+                                     planner=ai['planner'], avoid_dead_ends=ai['dead_ends'])
+    if ai['strategy'] == 'territory':
+        return evaluate_territory_moves(rinzler, player, occupancy)
+    if ai['strategy'] == 'alphabeta':
+        return search_best_move(rinzler, player, occupancy, ai)
+    if ai['strategy'] == 'mcts':
+        return mcts_best_move(rinzler, player, occupancy, ai)
+    if ai['reuse']:
+        move = follow_plan(rinzler, player, occupancy, ai)
+        if move is not None:
+            ai['reused'] += 1
+            return move
+        ai['replans'] += 1
+        ai['plan'].clear()
+    if ai['bounded']:
+        move = evaluate_bounded_moves(rinzler, player, occupancy)
+        if move is not None and ai['dead_ends']:
+            blocked = blocked_mask(occupancy)
+            if move not in prune_dead_ends(open_moves(rinzler, blocked), blocked):
+                move = None
+        if move is not None:
+            return move
+    plan = [] if ai['reuse'] else None
+    if ai['parallel']:
+        move = parallel_chase_moves(rinzler, player, occupancy, ai, plan=plan)
+    else:
+        move = evaluate_future_moves(rinzler, player, player_trail, rinzler_trail, obstacles, occupancy=occupancy,
+                                     planner=ai['planner'], avoid_dead_ends=ai['dead_ends'], plan=plan)
+    if plan:
+        ai['plan'].extend(plan)
+        ai['plan_goal'] = (player.x, player.y)
+    return move
+
+class Ponderer:
+    # Computes Rinzler's move for the next tick on a background thread while the main
+    # loop sleeps, guessing that the player keeps going the same way. The caller must
+    # not touch the game state or the ai dict until take() or stop() has joined it.
+    def __init__(self):
+        self.thread = None
+        self.prediction = None
+        self.move = None
+        self.ai = None
+        self.hits = self.misses = 0
+
+    def start(self, state, ai):
+        self.prediction = (state.tick, state.player_direction)
+        self.move = None
+        self.ai = ai
+        ai['stop'].clear()
+        sync_occupancy(state)
+        predicted = advance(state.player, state.player_direction)
+        self.thread = threading.Thread(target=self._run, args=(state, predicted, ai), daemon=True)
+        self.thread.start()
+
+    def _run(self, state, predicted, ai):
+        self.move = move_rinzler(state.rinzler, predicted, state.player_trail, state.rinzler_trail, state.obstacles, state.occupancy, ai,
+                                 state.size)
+
+    def take(self, state, player_direction):
+        # The pondered move if the player really is going `player_direction` this tick, otherwise None
+        if self.thread is None:
+            return None
+        if self.prediction != (state.tick, player_direction):
+            self.stop()
+            self.misses += 1
+            return None
+        self.thread.join()
+        self.thread = None
+        self.hits += 1
+        return self.move
+
+    def stop(self):
+        if self.thread is not None:
+            self.ai['stop'].set()
+            self.thread.join()
+            self.thread = None
+            self.ai['stop'].clear()
+
+def get_speed(elapsed_time):
+    if elapsed_time < SPEED_UP_DURATION:
+        return INITIAL_SPEED - (elapsed_time / SPEED_UP_DURATION) * (INITIAL_SPEED - MAX_SPEED)
+    return MAX_SPEED
+
+class GameState:
+    # Everything one match needs, with no terminal, audio or clock attached. In
+    # 'stamped' mode the trails are views of self.board and self.occupancy is only
+    # rebuilt (by sync_occupancy) when the AI is about to read it. In classic mode a
+    # trail can hold every cell of the board, so it never expires.
+    # The arena is size x size cells. Above SPARSE_ARENA_SIZE nothing is allocated per
+    # cell: there is no grid to draw, occupancy is a SparseCounts and the trails grow
+    # with their length, so memory follows the trails and obstacles, not the area.
+    # 'segments' mode stores trails as straight runs; on such big arenas the occupancy
+    # is then a TrailOccupancy view of them rather than a count per trail cell.
+    def __init__(self, rng=random, mode=None, classic=None, size=None):
+        size = GRID_SIZE if size is None else size
+        self.size = size
+        if size > SPARSE_ARENA_SIZE:
+            self.grid = None
+        else:
+            self.grid = create_grid(size)
+            add_boundary_walls(self.grid)
+        self.occupancy = create_occupancy(size)
+        self.obstacles = place_obstacles(self.grid, OBSTACLE_COUNT, self.occupancy, rng, size)
+        self.zobrist = create_zobrist(self.occupancy) if size == GRID_SIZE else None
+        self.player = Lightcycle(size // 2, size - 2)
+        self.player_direction = 'UP'
+        self.rinzler = Lightcycle(size // 2, 1)
+        self.rinzler_direction = 'DOWN'
+        if CLASSIC_MODE if classic is None else classic:
+            self.player_trail_length = self.rinzler_trail_length = size * size
+        else:
+            self.player_trail_length, self.rinzler_trail_length = PLAYER_TRAIL_LENGTH, RINZLER_TRAIL_LENGTH
+        self.mode = mode or TRAIL_MODE
+        if self.mode == 'stamped':
+            if size > SPARSE_ARENA_SIZE:
+                raise ValueError(f"stamped trails need an arena of at most {SPARSE_ARENA_SIZE} cells a side")
+            self.board = StampedBoard(self.obstacles, self.player_trail_length, self.rinzler_trail_length, size)
+            self.player_trail = StampedTrail(self.board, Owner.PLAYER)
+            self.rinzler_trail = StampedTrail(self.board, Owner.RINZLER)
+        elif self.mode == 'segments':
+            self.board = None
+            self.player_trail = SegmentTrail()
+            self.rinzler_trail = SegmentTrail()
+            if size > SPARSE_ARENA_SIZE:
+                # Only the obstacles are counted; trail cells are looked up in the runs
+                self.occupancy = TrailOccupancy(self.occupancy, (self.player_trail, self.rinzler_trail), size)
+        else:
+            self.board = None
+            self.player_trail = Trail(self.player_trail_length, size)
+            self.rinzler_trail = Trail(self.rinzler_trail_length, size)
+        self.ai = None  # AI for step() calls that pass none, made on first use
+        self.tick = 0
+        self.winner = None
+
+def sync_occupancy(state):
+    if state.board is not None:
+        state.board.sync(state.occupancy, state.zobrist)
+
+def collides(state, lightcycle):
+    if state.board is not None:
+        return state.board.is_solid(lightcycle.x, lightcycle.y)
+    return check_collision(lightcycle, [state.player_trail, state.rinzler_trail], state.obstacles, state.occupancy, state.size)
+
+def next_direction(current, requested):
+    # Cycles cannot reverse into their own trail
+    if requested is None or requested == OPPOSITE[current]:
+        return current
+    return requested
+
+def advance(lightcycle, direction):
+    dx, dy = DIRECTIONS[direction]
+    symbol, trail_symbol = SYMBOLS[direction]
+    return Lightcycle(lightcycle.x + dx, lightcycle.y + dy, symbol, trail_symbol)
+
+def step(state, player_action, ai=None, rinzler_action=None):
+    # Advance one tick. player_action is a direction or None to keep going; Rinzler's
+    # move comes from move_rinzler unless rinzler_action is given. Returns the winner
+    # ('player' or 'rinzler') once somebody crashes, otherwise None. Without an ai dict
+    # the state's own one is used, so planners and plans last the whole match.
+    state.player_direction = next_direction(state.player_direction, player_action)
+    state.player = advance(state.player, state.player_direction)
+
+    if ai is None:
+        ai = state.ai
+    if rinzler_action is None:
+        if ai is None:
+            ai = state.ai = create_ai()
+        sync_occupancy(state)
+        rinzler_action = move_rinzler(state.rinzler, state.player, state.player_trail, state.rinzler_trail,
+                                      state.obstacles, state.occupancy, ai, state.size)
+    state.rinzler_direction = rinzler_action
+    state.rinzler = advance(state.rinzler, rinzler_action)
+    state.tick += 1
+
+    # Boundary collisions first, then trails and obstacles; the player is checked first each time
+    if not in_arena(state.player, state.size):
+        state.winner = 'rinzler'
+    elif not in_arena(state.rinzler, state.size):
+        state.winner = 'player'
+    elif collides(state, state.player):
+        state.winner = 'rinzler'
+    elif collides(state, state.rinzler):
+        state.winner = 'player'
+    elif state.board is not None:
+        state.board.paint(state.player.x, state.player.y, Owner.PLAYER, state.player.trail_symbol, state.tick)
+        state.board.paint(state.rinzler.x, state.rinzler.y, Owner.RINZLER, state.rinzler.trail_symbol, state.tick)
+    else:
+        counts = None if isinstance(state.occupancy, TrailOccupancy) else state.occupancy
+        changed = ai['changed'] if ai is not None else None
+        update_trail(state.player_trail, state.player, state.player_trail_length, counts, state.zobrist, state.size, changed)
+        update_trail(state.rinzler_trail, state.rinzler, state.rinzler_trail_length, counts, state.zobrist, state.size, changed)
+    return state.winner
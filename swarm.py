@@ -0,0 +1,124 @@
+import random
+import time
+
+from engine import (
+    GRID_SIZE, PLAYER_INITIAL_X, PLAYER_INITIAL_Y, PLAYER_TRAIL_LENGTH, RINZLER_TRAIL_LENGTH,
+    OBSTACLE_COUNT, DIRECTIONS, OPPOSITE, Lightcycle, Trail, create_occupancy, place_obstacles,
+    update_trail, occupy, vacate, in_arena, is_occupied, advance, next_direction, flow_field, flow_move,
+    evaluate_future_moves,
+)
+
+TURN_CHANCE = 0.1  # The random player turns this often even when the way ahead is free
+
+class SwarmGame:
+    # One player against n chasers on one GRID_SIZE board, free-for-all: the player
+    # loses on any crash, including into a chaser's head, and each chaser is knocked
+    # out (its trail cleared) on hitting a wall, a trail or another chaser. With
+    # policy 'flow' one flow_field towards the player is built per tick and every
+    # chaser steps downhill on it; 'chase' runs evaluate_future_moves per chaser, as
+    # move_rinzler would. ai_time sums the seconds spent choosing chaser moves.
+    def __init__(self, n, seed=None, policy='flow'):
+        rng = random.Random(seed)
+        self.rng = rng
+        self.policy = policy
+        self.occupancy = create_occupancy(GRID_SIZE)
+        self.obstacles = place_obstacles(None, OBSTACLE_COUNT, self.occupancy, rng)
+        self.player = Lightcycle(PLAYER_INITIAL_X, PLAYER_INITIAL_Y)
+        self.player_direction = 'UP'
+        self.player_trail = Trail(PLAYER_TRAIL_LENGTH)
+        update_trail(self.player_trail, self.player, PLAYER_TRAIL_LENGTH, self.occupancy)
+
+        # Chasers start on free cells of the upper half, heading down
+        spawns = [(x, y) for y in range(1, GRID_SIZE // 2) for x in range(1, GRID_SIZE - 1)
+                  if not is_occupied(self.occupancy, x, y)]
+        self.chasers = []
+        self.directions = []
+        self.trails = []
+        for x, y in rng.sample(spawns, n):
+            chaser = Lightcycle(x, y)
+            trail = Trail(RINZLER_TRAIL_LENGTH)
+            update_trail(trail, chaser, RINZLER_TRAIL_LENGTH, self.occupancy)
+            self.chasers.append(chaser)
+            self.directions.append('DOWN')
+            self.trails.append(trail)
+        self.winner = None
+        self.tick = 0
+        self.ai_time = 0.0
+
+    def player_move(self):
+        # Keep going straight, turning now and then or when the way ahead is blocked
+        options = [move for move, (dx, dy) in DIRECTIONS.items()
+                   if move != OPPOSITE[self.player_direction]
+                   and 0 < self.player.x + dx < GRID_SIZE - 1 and 0 < self.player.y + dy < GRID_SIZE - 1
+                   and not is_occupied(self.occupancy, self.player.x + dx, self.player.y + dy)]
+        if self.player_direction in options and self.rng.random() > TURN_CHANCE:
+            return self.player_direction
+        return self.rng.choice(options) if options else self.player_direction
+
+    def chaser_moves(self):
+        started = time.perf_counter()
+        if self.policy == 'flow':
+            # Only the cells next to a chaser are ever read
+            targets = [(chaser.y + dy) * GRID_SIZE + chaser.x + dx
+                       for chaser in self.chasers for dx, dy in DIRECTIONS.values()]
+            field = flow_field((self.player.x, self.player.y), self.occupancy, targets=targets)
+            taken = set()
+            moves = []
+            for chaser, direction in zip(self.chasers, self.directions):
+                move = flow_move(chaser, direction, field, self.occupancy, taken)
+                dx, dy = DIRECTIONS[move]
+                taken.add((chaser.x + dx, chaser.y + dy))
+                moves.append(move)
+        else:
+            # The player's head is already on its trail; distance_layers needs the goal open
+            vacate(self.occupancy, self.player.x, self.player.y)
+            moves = [evaluate_future_moves(chaser, self.player, None, None, None, occupancy=self.occupancy)
+                     for chaser in self.chasers]
+            occupy(self.occupancy, self.player.x, self.player.y)
+        self.ai_time += time.perf_counter() - started
+        return moves
+
+    def step(self, player_action=None):
+        # Advance one tick. Returns the winner ('player' or 'chasers') once the player
+        # crashes or the last chaser is out, otherwise None.
+        if player_action is None:
+            player_action = self.player_move()
+        moves = self.chaser_moves()
+        self.player_direction = next_direction(self.player_direction, player_action)
+        self.player = advance(self.player, self.player_direction)
+        self.directions = [next_direction(d, move) for d, move in zip(self.directions, moves)]
+        self.chasers = [advance(chaser, d) for chaser, d in zip(self.chasers, self.directions)]
+        self.tick += 1
+
+        heads = {}
+        for chaser in self.chasers:
+            cell = (chaser.x, chaser.y)
+            heads[cell] = heads.get(cell, 0) + 1
+        if (not in_arena(self.player) or is_occupied(self.occupancy, self.player.x, self.player.y)
+                or (self.player.x, self.player.y) in heads):
+            self.winner = 'chasers'
+            return self.winner
+
+        crashed = [not in_arena(chaser) or is_occupied(self.occupancy, chaser.x, chaser.y)
+                   or heads[chaser.x, chaser.y] > 1 for chaser in self.chasers]
+        update_trail(self.player_trail, self.player, PLAYER_TRAIL_LENGTH, self.occupancy)
+        survivors = []
+        for chaser, direction, trail, out in zip(self.chasers, self.directions, self.trails, crashed):
+            if out:
+                while trail:
+                    x, y = trail.popleft()
+                    vacate(self.occupancy, x, y)
+            else:
+                update_trail(trail, chaser, RINZLER_TRAIL_LENGTH, self.occupancy)
+                survivors.append((chaser, direction, trail))
+        self.chasers = [chaser for chaser, _, _ in survivors]
+        self.directions = [direction for _, direction, _ in survivors]
+        self.trails = [trail for _, _, trail in survivors]
+        if not self.chasers:
+            self.winner = 'player'
+        return self.winner
+
+    def run(self, max_ticks):
+        while self.winner is None and self.tick < max_ticks:
+            self.step()
+        return self.winner
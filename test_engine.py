@@ -0,0 +1,110 @@
+import random
+
+import pytest
+
+from engine import (
+    GRID_SIZE, GameState, create_ai, create_grid, create_occupancy, add_boundary_walls, place_obstacles, step,
+    a_star, jump_point_search, landmark_tables, blocked_mask, open_moves, in_arena,
+)
+from batch import BatchGame, ORDER, no_reversals
+from benchmark import player_bot, simulate_match
+
+def play(seed, mode='buffer', size=GRID_SIZE, classic=False, max_ticks=1500):
+    # One match of the player bot against the chase AI; the budget is unlimited so
+    # deadlines cannot make two runs differ
+    state = GameState(random.Random(seed), mode, classic, size)
+    rng = random.Random(seed + 99)
+    ai = create_ai('chase', 'field', seed % 2 == 0)
+    ai['budget'] = float('inf')
+    while state.winner is None and state.tick < max_ticks:
+        step(state, player_bot(state, rng), ai)
+    return state.winner, state.tick, state.rinzler.x, state.rinzler.y
+
+def random_board(rng):
+    occupancy = bytearray(GRID_SIZE * GRID_SIZE)
+    density = rng.choice([0, 0.05, 0.15, 0.3, 0.45])
+    for i in range(len(occupancy)):
+        if rng.random() < density:
+            occupancy[i] = 1
+    free = [i for i in range(len(occupancy)) if not occupancy[i]]
+    start, goal = rng.choice(free), rng.choice(free)
+    return occupancy, (start % GRID_SIZE, start // GRID_SIZE), (goal % GRID_SIZE, goal // GRID_SIZE)
+
+@pytest.mark.parametrize('seed', range(20))
+def test_batch_matches_engine_step(seed):
+    # A one-match BatchGame replayed move by move through engine.step ends the same way
+    game = BatchGame(1, seed)
+    moves = []
+    while game.running and game.tick < 2000:
+        player_dirs = no_reversals(game.player_policy(), game.player_dirs)
+        rinzler_dirs = game.rinzler_policy()
+        moves.append((next(d for d in ORDER if player_dirs[d]), next(d for d in ORDER if rinzler_dirs[d])))
+        game.step(player_dirs, rinzler_dirs)
+    state = GameState(random.Random(seed))
+    for player_move, rinzler_move in moves:
+        if step(state, player_move, rinzler_action=rinzler_move):
+            break
+    assert (state.winner, state.tick) == (game.winners[0], game.lengths[0])
+
+def test_jump_point_search_matches_a_star():
+    rng = random.Random(1)
+    for _ in range(3000):
+        occupancy, start, goal = random_board(rng)
+        expected = a_star(start, goal, [], [], [], occupancy)
+        path = jump_point_search(start, goal, [], [], [], occupancy)
+        assert len(path) == len(expected)
+        previous = start
+        for x, y in path:
+            assert abs(x - previous[0]) + abs(y - previous[1]) == 1 and not occupancy[y * GRID_SIZE + x]
+            previous = (x, y)
+        if path:
+            assert previous == goal
+
+@pytest.mark.parametrize('seed', range(50))
+def test_alt_heuristic_keeps_a_star_optimal(seed):
+    # Landmark bounds are built over the obstacles alone, so they must stay admissible
+    rng = random.Random(seed)
+    grid = create_grid(GRID_SIZE)
+    add_boundary_walls(grid)
+    occupancy = create_occupancy(GRID_SIZE)
+    obstacles = place_obstacles(grid, 40, occupancy, rng)
+    landmarks = landmark_tables(obstacles)
+    free = [i for i in range(len(occupancy)) if not occupancy[i]]
+    for _ in range(20):
+        start, goal = rng.choice(free), rng.choice(free)
+        start, goal = (start % GRID_SIZE, start // GRID_SIZE), (goal % GRID_SIZE, goal // GRID_SIZE)
+        expected = a_star(start, goal, [], [], obstacles, occupancy)
+        assert len(a_star(start, goal, [], [], obstacles, occupancy, landmarks=landmarks)) == len(expected)
+
+@pytest.mark.parametrize('seed', range(5))
+def test_incremental_planner_matches_field(seed):
+    planners = {
+        'field': lambda: create_ai('chase', 'field', False, dead_ends=False, reuse=False),
+        'incremental': lambda: create_ai('chase', 'incremental', False, dead_ends=False, reuse=False),
+    }
+    _, decisions, _ = simulate_match(500, seed, planners)
+    assert decisions['incremental'] == decisions['field']
+
+@pytest.mark.parametrize('seed', range(10))
+def test_stamped_mode_plays_like_buffer(seed):
+    # StampedBoard trails expire by tick stamps rather than by popping cells
+    assert play(seed, 'stamped') == play(seed, 'buffer')
+
+@pytest.mark.parametrize('size, matches', [(GRID_SIZE, 10), (128, 6)])
+def test_segments_mode_plays_like_buffer(size, matches):
+    # Run-length trails, and above SPARSE_ARENA_SIZE the TrailOccupancy view, in
+    # ordinary and classic matches
+    for seed in range(matches):
+        classic = seed % 3 == 0
+        assert play(seed, 'segments', size, classic, 600) == play(seed, 'buffer', size, classic, 600)
+
+@pytest.mark.parametrize('seed', range(40))
+def test_reused_plans_stay_inside_the_walls(seed):
+    # Rinzler only ever drives into a wall when it has no open cell left
+    state = GameState(random.Random(seed))
+    rng = random.Random(seed + 99)
+    ai = create_ai('chase', 'incremental', reuse=True)
+    while state.winner is None and state.tick < 1500:
+        rinzler, blocked = state.rinzler, blocked_mask(state.occupancy)
+        step(state, player_bot(state, rng), ai)
+    assert in_arena(state.rinzler) or not open_moves(rinzler, blocked)